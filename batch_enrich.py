@@ -1,4 +1,4 @@
-from main import run_from_csv
+from use.search_by_name import run_from_csv
 
 if __name__ == "__main__":
     run_from_csv("sample_names.csv", "output.csv")
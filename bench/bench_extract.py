@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: contact extraction backends vs the original BeautifulSoup implementation.
+
+    python -m bench.bench_extract pages/            # every *.html / *.htm under pages/
+    python -m bench.bench_extract --synthetic 200   # generated pages, no files needed
+    python -m bench.bench_extract pages/ --save-from urls.txt   # download pages first
+"""
+import os, re, glob, time, random, argparse
+from urllib.parse import urljoin
+from clients.html_extract import EMAIL_RE, PHONE_RE, extract_contacts, available_backends
+
+def legacy_extract(html: str, base_url: str = ""):
+    """WebsiteClient._extract_from_html before pluggable backends (reference implementation)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text("\n", strip=True)
+
+    emails = set(EMAIL_RE.findall(text))
+    phones = set(PHONE_RE.findall(text))
+
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if href.lower().startswith("mailto:"):
+            emails.add(href.split(":", 1)[1])
+        if href.lower().startswith("tel:"):
+            phones.add(href.split(":", 1)[1])
+
+    contact_link = None
+    for a in soup.find_all("a", href=True):
+        txt = (a.get_text() or "").lower()
+        href = a["href"]
+        if any(k in txt for k in ["contact", "support", "help"]) and not href.startswith("mailto:"):
+            contact_link = urljoin(base_url, href)
+            break
+
+    return {"emails": emails, "phones": phones, "contact_link": contact_link}
+
+def synthetic_page(i: int, rnd: random.Random) -> str:
+    para = " ".join(rnd.choice(["lorem", "ipsum", "dolor", "sit", "amet", "fitness", "coffee"]) for _ in range(60))
+    nav = "".join(f'<li><a href="/p{j}">Page {j}</a></li>' for j in range(40))
+    body = "".join(f"<section><h2>Block {j}</h2><p>{para}</p></section>" for j in range(30))
+    return (f"<html><head><title>Site {i}</title><script>var x = {i};</script>"
+            f"<style>body{{color:red}}</style></head><body><nav><ul>{nav}</ul></nav>{body}"
+            f'<footer><a href="/contact">Contact us</a> <a href="mailto:info{i}@site{i}.com">Mail</a> '
+            f'<a href="tel:+1 555 010 {i % 10000:04d}">Call</a> sales{i}@site{i}.com +44 20 7946 {i % 10000:04d}'
+            f"</footer></body></html>")
+
+def load_pages(path: str):
+    files = sorted(glob.glob(os.path.join(path, "**", "*.htm*"), recursive=True))
+    pages = []
+    for f in files:
+        with open(f, encoding="utf-8", errors="replace") as fh:
+            pages.append(fh.read())
+    return pages
+
+def save_pages(url_file: str, out_dir: str):
+    from utils import BROWSER
+    os.makedirs(out_dir, exist_ok=True)
+    with open(url_file) as fh:
+        urls = [u.strip() for u in fh if u.strip()]
+    for i, url in enumerate(urls):
+        try:
+            r = BROWSER.get(url, timeout=(5, 15))
+            name = re.sub(r"[^A-Za-z0-9]+", "_", url)[:80]
+            with open(os.path.join(out_dir, f"{i:05d}_{name}.html"), "w", encoding="utf-8") as fh:
+                fh.write(r.text)
+        except Exception as e:
+            print(f"skip {url}: {e}")
+
+def run(pages, repeat: int = 3):
+    impls = [("legacy-bs4", legacy_extract)]
+    impls += [(name, lambda html, base, n=name: extract_contacts(html, base, n)) for name in available_backends()]
+
+    reference = [legacy_extract(p, "https://example.com") for p in pages]
+    total_kb = sum(len(p) for p in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KiB, best of {repeat}\n")
+    print(f"{'backend':<12} {'ms/page':>9} {'pages/s':>9} {'speedup':>8} {'mismatch':>9}")
+    base_ms = None
+    for name, fn in impls:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            results = [fn(p, "https://example.com") for p in pages]
+            best = min(best, time.perf_counter() - t0)
+        ms = best * 1000 / max(1, len(pages))
+        base_ms = base_ms or ms
+        mismatch = sum(1 for r, ref in zip(results, reference)
+                       if (r["emails"], r["phones"]) != (ref["emails"], ref["phones"]))
+        print(f"{name:<12} {ms:>9.2f} {1000 / ms:>9.0f} {base_ms / ms:>7.1f}x {mismatch:>9}")
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("pages", nargs="?", help="directory of saved .html pages")
+    p.add_argument("--synthetic", type=int, default=0, help="benchmark N generated pages instead")
+    p.add_argument("--save-from", help="file with one URL per line to download into the pages dir first")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    if args.save_from:
+        save_pages(args.save_from, args.pages or "bench_pages")
+    if args.synthetic:
+        rnd = random.Random(42)
+        pages = [synthetic_page(i, rnd) for i in range(args.synthetic)]
+    else:
+        pages = load_pages(args.pages or "bench_pages")
+    if not pages:
+        raise SystemExit("No pages to benchmark (pass a directory of .html files or --synthetic N)")
+    run(pages, args.repeat)
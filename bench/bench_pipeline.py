@@ -0,0 +1,136 @@
+"""
+End-to-end throughput benchmark for use.search_by_name.run_from_csv, fully offline:
+Bright Data and every company website are served by bench/fake_services.py, so no
+credentials are needed and nothing is billed.
+
+    python -m bench.bench_pipeline                          # 100, 1k and 10k rows
+    python -m bench.bench_pipeline --rows 100 1000 --workers 16 --site-latency 0.1
+    python -m bench.bench_pipeline --rows 1000 --json bench_results.json
+
+Each size runs in a fresh subprocess (cold caches in a temp dir, own peak RSS) and reports
+rows/sec, p50/p99 latency per stage (from metrics.py) and peak memory.
+"""
+import os, sys, json, time, random, tempfile, argparse, subprocess
+from typing import Dict, Any, List
+
+WORDS = ["blue", "north", "summit", "harbor", "maple", "iron", "bright", "cedar", "nova", "river"]
+KINDS = ["Fitness", "Coffee", "Dental", "Labs", "Logistics", "Bakery", "Studio", "Partners", "Robotics"]
+STAGES = ("serp", "trigger", "snapshot", "dataset_wait", "crawl", "site")
+
+def write_names(path: str, rows: int, dup_rate: float = 0.05, seed: int = 0):
+    """Unique synthetic company names, with `dup_rate` near-duplicates ("X Inc.") mixed in."""
+    rnd = random.Random(seed)
+    names: List[str] = []
+    for i in range(rows):
+        if names and rnd.random() < dup_rate:
+            names.append(rnd.choice(names) + " Inc.")
+        else:
+            names.append(f"{rnd.choice(WORDS).title()} {rnd.choice(KINDS)} {i}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("business_name\n" + "\n".join(names) + "\n")
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+def child(args):
+    """Runs inside the benchmark subprocess: one run_from_csv call, result JSON to args.result."""
+    import contextlib
+    from metrics import METRICS
+    from use.search_by_name import run_from_csv
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        run_from_csv(args.input, os.path.join(args.workdir, "out.jsonl"), workers=args.workers,
+                     batch_size=args.batch_size, metrics_json=None)
+    wall = time.perf_counter() - t0
+    summary = METRICS.summary()
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump({"rows": args.rows, "wall_secs": wall, "rows_per_sec": args.rows / wall if wall else 0.0,
+                   "peak_rss_mb": peak_rss_mb(), "billable_calls": summary["billable_calls"],
+                   "stages": summary["stages"]}, f)
+
+def run_size(rows: int, base_url: str, args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix=f"bench_{rows}_")
+    input_csv = os.path.join(workdir, "names.csv")
+    result = os.path.join(workdir, "result.json")
+    write_names(input_csv, rows)
+    env = dict(os.environ)
+    env.update({
+        # fake credentials: every Bright Data call goes to the local stand-in
+        "BRIGHTDATA_API_KEY": "bench", "BRIGHTDATA_API_ZONE": "bench", "BD_COMPANY_DATASET_ID": "bench",
+        "LINKEDIN_ACCESS_TOKEN": "bench", "LINKEDIN_MEMBER_URN": "urn:li:person:bench",
+        "BRIGHTDATA_API_BASE": base_url,
+        # websites are reached through the stand-in acting as an HTTP proxy
+        "HTTP_PROXY": base_url, "HTTPS_PROXY": base_url, "NO_PROXY": "127.0.0.1,localhost",
+        "CRAWL_DNS_CHECK": "0",
+        # cold, throwaway caches
+        "SERP_CACHE_PATH": os.path.join(workdir, "serp.sqlite"),
+        "BD_SNAPSHOT_STORE": os.path.join(workdir, "snapshots.sqlite"),
+        "PAGE_STORE_PATH": os.path.join(workdir, "pages.sqlite"),
+        "RESULT_STORE_PATH": os.path.join(workdir, "results.sqlite"),
+        "LOG_LEVEL": "ERROR",
+    })
+    if not args.real_budgets:  # measure the pipeline, not the production rate budgets
+        env.update({f"BD_RATE_{n}": "1000:1000" for n in ("SERP", "SCRAPE", "TRIGGER", "SNAPSHOT")})
+    cmd = [sys.executable, "-m", "bench.bench_pipeline", "--child", "--rows", str(rows), "--input", input_csv,
+           "--workdir", workdir, "--result", result, "--workers", str(args.workers),
+           "--batch-size", str(args.batch_size)]
+    subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(result, encoding="utf-8") as f:
+        return json.load(f)
+
+def print_report(results: List[Dict[str, Any]]):
+    print(f"\n{'rows':>7}{'secs':>9}{'rows/s':>9}{'peak MB':>9}{'billable':>10}")
+    for r in results:
+        print(f"{r['rows']:>7}{r['wall_secs']:>9.1f}{r['rows_per_sec']:>9.1f}{r['peak_rss_mb']:>9.0f}{r['billable_calls']:>10}")
+    print(f"\n{'rows':>7}  {'stage':<14}{'calls':>7}{'p50 s':>9}{'p99 s':>9}")
+    for r in results:
+        for stage in STAGES:
+            s = r["stages"].get(stage)
+            if s:
+                print(f"{r['rows']:>7}  {stage:<14}{s['calls']:>7}{s['latency_secs']['p50']:>9.3f}{s['latency_secs']['p99']:>9.3f}")
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--batch-size", type=int, default=100)
+    p.add_argument("--api-latency", type=float, default=0.02, help="mean seconds per fake Bright Data call")
+    p.add_argument("--site-latency", type=float, default=0.05, help="mean seconds per fake website page")
+    p.add_argument("--snapshot-secs", type=float, default=1.0, help="fake trigger → snapshot ready delay")
+    p.add_argument("--error-rate", type=float, default=0.02)
+    p.add_argument("--dead-rate", type=float, default=0.05)
+    p.add_argument("--real-budgets", action="store_true", help="keep the BD_RATE_* request budgets")
+    p.add_argument("--json", help="also write the results to this file")
+    # internal: the per-size subprocess
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    p.add_argument("--input", help=argparse.SUPPRESS)
+    p.add_argument("--workdir", help=argparse.SUPPRESS)
+    p.add_argument("--result", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        args.rows = args.rows[0]
+        return child(args)
+
+    from bench.fake_services import FakeServices, FakeConfig
+    svc = FakeServices(FakeConfig(args.api_latency, args.site_latency, args.snapshot_secs,
+                                  args.error_rate, args.dead_rate)).start()
+    results = []
+    try:
+        for rows in args.rows:
+            print(f"[BENCH] {rows} rows…", flush=True)
+            results.append(run_size(rows, svc.base_url, args))
+    finally:
+        svc.stop()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Local stand-ins for Bright Data and company websites, for offline benchmarks.
+
+One threaded HTTP server plays three roles:
+- Bright Data API (point BRIGHTDATA_API_BASE at it):
+    POST /request                    SERP JSON ({"organic": [...]}) for the google query in "url"
+    POST /datasets/v3/scrape         company records, synchronously
+    POST /datasets/v3/trigger        {"snapshot_id": ...}
+    GET  /datasets/v3/snapshots/<id> 202 {"status": "running"} until `snapshot_secs` passed, then the records
+- every company website, as an HTTP proxy (HTTP_PROXY=http://127.0.0.1:<port>):
+  homepage → /contact page with an email and a phone; a deterministic share of hosts is
+  dead (connection dropped) or answers 500.
+
+    python -m bench.fake_services --port 8765 --site-latency 0.05 --dead-rate 0.05
+"""
+import re, json, time, random, zlib, argparse, threading, itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, Optional
+
+class FakeConfig:
+    def __init__(self, api_latency: float = 0.02, site_latency: float = 0.05, snapshot_secs: float = 1.0,
+                 error_rate: float = 0.02, dead_rate: float = 0.05, seed: int = 0):
+        self.api_latency = api_latency      # mean seconds per Bright Data call
+        self.site_latency = site_latency    # mean seconds per website page
+        self.snapshot_secs = snapshot_secs  # trigger → snapshot ready
+        self.error_rate = error_rate        # share of hosts answering 500 / of SERP calls failing
+        self.dead_rate = dead_rate          # share of hosts that drop every connection
+        self.seed = seed
+
+_QUERY_NOISE = re.compile(r"site:\S+|-site:\S+|\bofficial site\b", re.I)
+
+def slug(query: str) -> str:
+    words = re.findall(r"[a-z0-9]+", _QUERY_NOISE.sub(" ", query.lower()))
+    return "".join(words) or "company"
+
+def _share(key: str, seed: int) -> float:
+    """Deterministic 0..1 value per key, so a host is dead/broken for the whole run."""
+    return (zlib.crc32(f"{seed}:{key}".encode()) % 10_000) / 10_000
+
+class FakeServices:
+    def __init__(self, config: Optional[FakeConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeConfig()
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self.hits: Dict[str, int] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, what: str):
+        with self._lock:
+            self.hits[what] = self.hits.get(what, 0) + 1
+
+    # ---------- responses ----------
+    def _sleep(self, mean: float):
+        if mean > 0:
+            time.sleep(random.expovariate(1 / mean))
+
+    def serp(self, body: Dict[str, Any]):
+        self._sleep(self.config.api_latency)
+        q = parse_qs(urlparse(body.get("url", "")).query).get("q", [""])[0]
+        if random.random() < self.config.error_rate / 4:
+            return 503, {"error": "busy"}
+        s = slug(q)
+        return 200, {"organic": [
+            {"link": f"https://www.linkedin.com/company/{s}", "title": q},
+            {"link": f"http://www.{s}.com/", "title": q},
+            {"link": f"https://www.yelp.com/biz/{s}", "title": q},
+        ]}
+
+    def records(self, inputs):
+        out = []
+        for i in inputs:
+            url = i.get("url", "")
+            s = url.rstrip("/").rsplit("/", 1)[-1]
+            out.append({"input": {"url": url}, "url": url, "name": s, "website": f"http://www.{s}.com/",
+                        "industries": "Software", "company_size": "11-50 employees"})
+        return out
+
+    def trigger(self, body: Dict[str, Any]):
+        self._sleep(self.config.api_latency)
+        snap = f"s_bench_{next(self._ids)}"
+        with self._lock:
+            self.snapshots[snap] = {"ready": time.time() + self.config.snapshot_secs, "input": body.get("input", [])}
+        return 200, {"snapshot_id": snap}
+
+    def snapshot(self, snap: str):
+        self._sleep(self.config.api_latency)
+        with self._lock:
+            job = self.snapshots.get(snap)
+        if job is None:
+            return 404, {"error": "unknown snapshot"}
+        if time.time() < job["ready"]:
+            return 202, {"status": "running"}
+        return 200, self.records(job["input"])
+
+    def page(self, url: str):
+        """(status, html) for a proxied website request, or None to drop the connection."""
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        share = _share(host, self.config.seed)
+        if share < self.config.dead_rate:
+            return None
+        self._sleep(self.config.site_latency)
+        if share < self.config.dead_rate + self.config.error_rate:
+            return 500, "<h1>Internal Server Error</h1>"
+        name = host.removeprefix("www.").split(".")[0]
+        if parsed.path in ("", "/"):
+            nav = "".join(f'<a href="/p{j}">Page {j}</a>' for j in range(20))
+            return 200, (f"<html><head><title>{name}</title></head><body><nav>{nav}"
+                         f'<a href="/about">About us</a><a href="/contact">Contact</a></nav>'
+                         f"<p>{('Welcome to ' + name + '. ') * 40}</p></body></html>")
+        if parsed.path.startswith("/contact"):
+            n = zlib.crc32(name.encode()) % 10_000
+            return 200, (f'<html><body><h1>Contact</h1><p>Write to <a href="mailto:hello@{name}.com">us</a> '
+                         f"or call +1 415 555 {n:04d}.</p></body></html>")
+        if parsed.path.startswith("/about"):
+            return 200, f"<html><body><p>About {name}.</p></body></html>"
+        return 404, "<h1>Not Found</h1>"
+
+    # ---------- HTTP plumbing ----------
+    def _handler(self):
+        svc = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, body, ctype: str = "application/json"):
+                data = (json.dumps(body) if ctype == "application/json" else body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _json_body(self) -> Dict[str, Any]:
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                return json.loads(raw or b"{}")
+
+            def do_POST(self):
+                body = self._json_body()
+                if self.path.startswith("/request"):
+                    svc._count("serp")
+                    return self._send(*svc.serp(body))
+                if self.path.startswith("/datasets/v3/trigger"):
+                    svc._count("trigger")
+                    return self._send(*svc.trigger(body))
+                if self.path.startswith("/datasets/v3/scrape"):
+                    svc._count("scrape")
+                    svc._sleep(svc.config.api_latency)
+                    return self._send(200, svc.records(body.get("input", [])))
+                self._send(404, {"error": "not found"})
+
+            def do_GET(self):
+                if self.path.startswith("http://"):  # proxied website request
+                    svc._count("site")
+                    got = svc.page(self.path)
+                    if got is None:
+                        self.close_connection = True
+                        return
+                    return self._send(got[0], got[1], "text/html; charset=utf-8")
+                if self.path.startswith("/datasets/v3/snapshots/"):
+                    svc._count("snapshot")
+                    return self._send(*svc.snapshot(self.path.rsplit("/", 1)[-1].split("?")[0]))
+                self._send(404, {"error": "not found"})
+
+            def do_CONNECT(self):  # no HTTPS tunnelling: keeps benchmarks off the real internet
+                self._send(405, {"error": "https sites are not simulated"})
+
+        return Handler
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--api-latency", type=float, default=0.02)
+    p.add_argument("--site-latency", type=float, default=0.05)
+    p.add_argument("--snapshot-secs", type=float, default=1.0)
+    p.add_argument("--error-rate", type=float, default=0.02)
+    p.add_argument("--dead-rate", type=float, default=0.05)
+    args = p.parse_args()
+    svc = FakeServices(FakeConfig(args.api_latency, args.site_latency, args.snapshot_secs,
+                                  args.error_rate, args.dead_rate), port=args.port).start()
+    print(f"fake Bright Data + websites on {svc.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        svc.stop()
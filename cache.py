@@ -0,0 +1,136 @@
+import os, json, time, sqlite3, threading
+from typing import Any, Optional
+from metrics import METRICS
+
+MISSING = object()
+
+def normalize_query(q: str) -> str:
+    """Cache key for a search query: case- and whitespace-insensitive."""
+    return " ".join((q or "").lower().split())
+
+class TTLCache:
+    """Minimal cache interface; subclass to plug in another backend (redis, dict, …)."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+class NullCache(TTLCache):
+    """Never stores anything (use to disable caching)."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+class SQLiteTTLCache(TTLCache):
+    """
+    JSON values in one SQLite table:
+    - entries older than `ttl_secs` are treated as missing (and purged lazily)
+    - at most `max_entries` rows; least recently written rows are evicted first
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl_secs: float = 7 * 86400, max_entries: int = 100_000):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.table = table
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT, ts REAL)")
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table}(ts)")
+        self._db.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._db.execute(f"SELECT value, ts FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return default
+            if time.time() - row[1] > self.ttl_secs:
+                self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._db.commit()
+                return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        blob = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, ts) VALUES (?, ?, ?)",
+                             (key, blob, time.time()))
+            self._writes += 1
+            if self._writes % 256 == 1:
+                self._evict()
+            self._db.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _evict(self):
+        self._db.execute(f"DELETE FROM {self.table} WHERE ts < ?", (time.time() - self.ttl_secs,))
+        (n,) = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        if n > self.max_entries:
+            self._db.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY ts ASC LIMIT ?)", (n - self.max_entries,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+class SerpCache:
+    """
+    Positive + negative SERP caches keyed by normalized query.
+    Negative hits ("no result") live in their own table with a shorter TTL,
+    so a company that gets a LinkedIn page later is picked up sooner.
+    """
+
+    def __init__(self, positive: TTLCache, negative: TTLCache):
+        self.positive = positive
+        self.negative = negative
+
+    @classmethod
+    def from_env(cls) -> "SerpCache":
+        if os.getenv("SERP_CACHE", "1").lower() in ("0", "false", "off", "no"):
+            return cls(NullCache(), NullCache())
+        path = os.getenv("SERP_CACHE_PATH", os.path.join(".cache", "serp.sqlite"))
+        max_entries = int(os.getenv("SERP_CACHE_MAX_ENTRIES", "200000"))
+        ttl = float(os.getenv("SERP_CACHE_TTL_DAYS", "30")) * 86400
+        neg_ttl = float(os.getenv("SERP_CACHE_NEGATIVE_TTL_DAYS", "3")) * 86400
+        return cls(SQLiteTTLCache(path, "serp_hits", ttl, max_entries),
+                   SQLiteTTLCache(path, "serp_misses", neg_ttl, max_entries))
+
+    def lookup(self, query: str) -> Any:
+        """Cached value, None for a cached miss, or MISSING when the query was never seen."""
+        key = normalize_query(query)
+        hit = self.positive.get(key, MISSING)
+        if hit is not MISSING:
+            METRICS.count("serp", "cache_hits")
+            return hit
+        if self.negative.get(key, MISSING) is not MISSING:
+            METRICS.count("serp", "cache_negative_hits")
+            return None
+        METRICS.count("serp", "cache_misses")
+        return MISSING
+
+    def store(self, query: str, value: Optional[Any]) -> None:
+        key = normalize_query(query)
+        if value:
+            self.positive.set(key, value)
+            self.negative.delete(key)
+        else:
+            self.negative.set(key, True)
@@ -1,47 +1,126 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-import os
-from typing import Optional, Dict, Any
-import google.generativeai as genai
-from google.api_core.exceptions import ResourceExhausted, GoogleAPIError
+import os, json, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from cache import TTLCache, NullCache, SQLiteTTLCache, MISSING
+from metrics import METRICS
+from ratelimit import LIMITER, backoff_delay
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 PRIMARY_MODEL  = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
 FALLBACK_MODEL = "gemini-1.5-flash"
 
+def prompt_cache_from_env() -> TTLCache:
+    """GEMINI_CACHE (on), GEMINI_CACHE_PATH, GEMINI_CACHE_TTL_DAYS, GEMINI_CACHE_MAX_ENTRIES."""
+    if os.getenv("GEMINI_CACHE", "1").lower() in ("0", "false", "off", "no"):
+        return NullCache()
+    return SQLiteTTLCache(os.getenv("GEMINI_CACHE_PATH", os.path.join(".cache", "gemini.sqlite")), "drafts",
+                          float(os.getenv("GEMINI_CACHE_TTL_DAYS", "30")) * 86400,
+                          int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "50000")))
+
+def cache_key(model: str, prompt: str, params: Dict[str, Any]) -> str:
+    blob = json.dumps([model, prompt, params], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
 class GeminiClient:
-    """Minimal Gemini wrapper: auth, model selection, fallback, generate()."""
+    """Minimal Gemini wrapper: auth, model selection, fallback, generate() / generate_many()."""
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 cache: Optional[TTLCache] = None, retries: int = 2):
+        """
+        cache: prompt-result cache keyed by (model, prompt, generation params)
+               (default: .cache/gemini.sqlite, GEMINI_CACHE=0 disables).
+        retries: rate-limit / server-error retries per prompt; they go to FALLBACK_MODEL.
+        """
         key = api_key or GEMINI_API_KEY
         if not key:
             raise RuntimeError("GEMINI_API_KEY (or GOOGLE_API_KEY) is missing in environment.")
+        import google.generativeai as genai  # heavy (grpc/protobuf): only loaded once a client is built
+        self._genai = genai
         genai.configure(api_key=key)
-        self.model_name = model or PRIMARY_MODEL
-        self.model = genai.GenerativeModel(self.model_name)
+        self._models: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        self.retries = retries
+        self.cache = cache if cache is not None else prompt_cache_from_env()
+        self._set_model(model or PRIMARY_MODEL)
+
+    def _model(self, name: str):
+        """GenerativeModel per name, built once and shared by every thread."""
+        with self._models_lock:
+            m = self._models.get(name)
+            if m is None:
+                m = self._models[name] = self._genai.GenerativeModel(name)
+            return m
 
     def _set_model(self, name: str):
         self.model_name = name
-        self.model = genai.GenerativeModel(name)
+        self.model = self._model(name)
 
-    def generate(self, prompt: str, **kwargs) -> Dict[str, Any]:
-        """Return dict: text + model + candidates + safety (no channel knowledge)."""
+    def _call(self, model_name: str, prompt: str, **kwargs):
+        t0 = time.perf_counter()
         try:
-            resp = self.model.generate_content(prompt, **kwargs)
-        except ResourceExhausted:
-            if self.model_name != FALLBACK_MODEL:
-                self._set_model(FALLBACK_MODEL)
-                resp = self.model.generate_content(prompt, **kwargs)
-            else:
-                raise
-        except GoogleAPIError as e:
-            raise RuntimeError(f"Gemini error: {e}")
+            resp = self._model(model_name).generate_content(prompt, **kwargs)
+        except Exception as e:
+            METRICS.observe("gemini", time.perf_counter() - t0, type(e).__name__)
+            raise
+        METRICS.observe("gemini", time.perf_counter() - t0, "ok")
+        return resp
+
+    def _generate(self, prompt: str, **kwargs) -> Tuple[str, Any]:
+        """(model that answered, response): behind the "gemini" rate budget, retries on FALLBACK_MODEL."""
+        from google.api_core.exceptions import (ResourceExhausted, ServiceUnavailable, DeadlineExceeded,
+                                                InternalServerError, GoogleAPIError)
+        bucket = LIMITER.bucket("gemini")
+        name = self.model_name
+        for attempt in range(self.retries + 1):
+            if attempt:
+                METRICS.retry("gemini")
+                if name == FALLBACK_MODEL:  # switching models is immediate; the same model backs off
+                    time.sleep(backoff_delay(attempt - 1))
+                name = FALLBACK_MODEL
+            bucket.acquire()
+            try:
+                resp = self._call(name, prompt, **kwargs)
+                bucket.reward()
+                return name, resp
+            except (ResourceExhausted, ServiceUnavailable, DeadlineExceeded, InternalServerError) as e:
+                if isinstance(e, ResourceExhausted):
+                    bucket.penalize()
+                if attempt == self.retries:
+                    raise RuntimeError(f"Gemini error: {e}")
+            except GoogleAPIError as e:
+                raise RuntimeError(f"Gemini error: {e}")
 
+    def generate(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Return dict: text + model + candidates + safety + cached (no channel knowledge)."""
+        primary = self.model_name
+        key = cache_key(primary, prompt, kwargs)
+        hit = self.cache.get(key, MISSING)
+        if hit is not MISSING:
+            METRICS.count("gemini", "cache_hits")
+            return {**hit, "safety": None, "cached": True}
+        METRICS.count("gemini", "cache_misses")
+
+        model_name, resp = self._generate(prompt, **kwargs)
         text = (getattr(resp, "text", None) or "").replace("```", "").strip()
-        return {
-            "text": text,
-            "model": self.model_name,
-            "candidates": len(getattr(resp, "candidates", []) or []),
-            "safety": getattr(resp, "prompt_feedback", None),
-        }
+        out = {"text": text, "model": model_name, "candidates": len(getattr(resp, "candidates", []) or [])}
+        if text and model_name == primary:  # a fallback answer must not be served as the primary model's
+            self.cache.set(key, out)
+        return {**out, "safety": getattr(resp, "prompt_feedback", None), "cached": False}
+
+    def generate_many(self, prompts: List[str], workers: int = 4, **kwargs) -> List[Dict[str, Any]]:
+        """
+        generate() for every prompt, `workers` at a time (plus the "gemini" rate budget), in input order.
+        A prompt that fails gets {"text": "", "error": ...} instead of failing the batch.
+        """
+        def one(prompt: str) -> Dict[str, Any]:
+            try:
+                return self.generate(prompt, **kwargs)
+            except Exception as e:
+                return {"text": "", "model": self.model_name, "candidates": 0, "safety": None,
+                        "cached": False, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="gemini") as pool:
+            return list(pool.map(one, prompts))
@@ -0,0 +1,140 @@
+import os, re
+from typing import Dict, List, Tuple, Callable, Optional, Any
+from urllib.parse import urljoin, urlparse
+
+EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
+PHONE_RE = re.compile(r"(?:(?:\+?\d{1,3}[\s.\-]?)?(?:\(?\d{2,4}\)?[\s.\-]?)?\d{3,4}[\s.\-]?\d{4})")
+CONTACT_WORDS = ("contact", "support", "help")
+# Link keywords for contact-page discovery, best first (matched on anchor text and URL path)
+CONTACT_KEYWORDS = [
+    ("contact", "kontakt", "contacto", "contatti", "get-in-touch", "reach-us"),
+    ("impressum", "imprint", "legal", "mentions"),
+    ("about", "uber-uns", "qui-sommes", "team", "company"),
+    ("support", "help", "locations", "offices"),
+]
+
+# A backend turns HTML into (visible text, [(anchor text, href), ...]) in a single parse.
+Backend = Callable[[str], Tuple[str, List[Tuple[str, str]]]]
+
+def _selectolax(html: str):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+    tree = HTMLParser(html)
+    tree.strip_tags(["script", "style", "noscript", "template"])
+    root = tree.root
+    text = root.text(separator="\n", strip=True) if root is not None else ""
+    links = [(a.text() or "", a.attributes.get("href") or "") for a in tree.css("a[href]")]
+    return text, links
+
+def _lxml(html: str):
+    import lxml.html
+    from lxml import etree
+    doc = lxml.html.document_fromstring(html.encode("utf-8", "replace"),
+                                        parser=lxml.html.HTMLParser(encoding="utf-8"))
+    etree.strip_elements(doc, "script", "style", "noscript", "template", etree.Comment, with_tail=False)
+    text = "\n".join(t.strip() for t in doc.itertext() if t.strip())
+    links = [(a.text_content() or "", a.get("href") or "") for a in doc.iter("a") if a.get("href") is not None]
+    return text, links
+
+def _bs4(html: str):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text("\n", strip=True), [(a.get_text() or "", a["href"]) for a in soup.find_all("a", href=True)]
+
+BACKENDS: Dict[str, Backend] = {"selectolax": _selectolax, "lxml": _lxml, "bs4": _bs4}
+_PROBES = {"selectolax": "selectolax", "lxml": "lxml.html", "bs4": "bs4"}
+
+def available_backends() -> List[str]:
+    names = []
+    for name, module in _PROBES.items():
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+def pick_backend(name: Optional[str] = None) -> str:
+    """HTML_BACKEND (selectolax | lxml | bs4 | auto); auto = fastest installed."""
+    name = (name or os.getenv("HTML_BACKEND", "auto")).lower()
+    avail = available_backends()
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown HTML backend: {name} (use one of {', '.join(BACKENDS)} or auto)")
+        if name in avail:
+            return name
+    return avail[0] if avail else "bs4"
+
+def extract_contacts(html: str, base_url: str = "", backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    emails/phones from visible text and mailto:/tel: links, first contact-ish link,
+    and every (anchor text, href) pair for contact-page discovery, from one parse.
+    """
+    name = backend or pick_backend()
+    try:
+        text, links = BACKENDS[name](html)
+    except Exception:
+        if name == "bs4":
+            raise
+        text, links = _bs4(html)
+
+    emails = set(EMAIL_RE.findall(text))
+    phones = set(PHONE_RE.findall(text))
+    contact_link = None
+    for txt, href in links:
+        href = href.strip()
+        low = href.lower()
+        if low.startswith("mailto:"):
+            emails.add(href.split(":", 1)[1])
+            continue
+        if low.startswith("tel:"):
+            phones.add(href.split(":", 1)[1])
+        if contact_link is None and any(k in txt.lower() for k in CONTACT_WORDS):
+            contact_link = urljoin(base_url, href)
+
+    return {"emails": emails, "phones": phones, "contact_link": contact_link, "links": links}
+
+def rank_contact_links(links: List[Tuple[str, str]], base_url: str) -> List[str]:
+    """Same-site links that look like contact/about pages, best candidates first."""
+    host = urlparse(base_url).netloc.lower().removeprefix("www.")
+    ranked = []
+    for text, href in links:
+        href = href.strip()
+        if not href or href.lower().startswith(("mailto:", "tel:", "javascript:", "#")):
+            continue
+        url = urljoin(base_url + "/", href).split("#")[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or parsed.netloc.lower().removeprefix("www.") != host:
+            continue
+        hay = f"{text} {parsed.path}".lower()
+        for rank, words in enumerate(CONTACT_KEYWORDS):
+            if any(w in hay for w in words):
+                ranked.append((rank, url))
+                break
+    seen, out = set(), []
+    for _, url in sorted(ranked, key=lambda t: t[0]):
+        key = url.rstrip("/")
+        if key not in seen and key != base_url.rstrip("/"):
+            seen.add(key)
+            out.append(url)
+    return out
+
+def parse_page(body: bytes, encoding: Optional[str], base_url: str, backend: Optional[str] = None,
+               max_links: int = 20) -> Dict[str, Any]:
+    """
+    Raw response bytes → small, picklable result (lists only), so it can run in a worker process:
+    {"emails", "phones", "contact_link", "contact_links"}.
+    """
+    try:
+        html = body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        html = body.decode("utf-8", errors="replace")
+    found = extract_contacts(html, base_url, backend)
+    return {
+        "emails": sorted(found["emails"]),
+        "phones": sorted(found["phones"]),
+        "contact_link": found["contact_link"],
+        "contact_links": rank_contact_links(found["links"], base_url)[:max_links],
+    }
@@ -1,16 +1,96 @@
-import os, json, time, requests
-from typing import Optional, Dict, Any
-from utils import SESSION, SERP_ZONE, DATASET_ID, google_query_url, backoff_sleep, log
+import os, json, hashlib, threading
+from difflib import SequenceMatcher
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeout, wait
+from typing import Optional, Dict, Any, List, Iterable, Callable, Tuple, Union
+from cache import TTLCache, SQLiteTTLCache, SerpCache, MISSING
+from clients.snapshot_poller import SnapshotPoller
+from names import canonical_name
+from records import CompanyProfile, project_company
+import ratelimit as http
+from utils import SERP_ZONE, DATASET_ID, BD_API_BASE, google_query_url, backoff_sleep, log
 
 # Bright Data endpoints
-API_SERP     = "https://api.brightdata.com/request"
-API_SCRAPE   = "https://api.brightdata.com/datasets/v3/scrape"
-API_TRIGGER  = "https://api.brightdata.com/datasets/v3/trigger"
-API_SNAPSHOT = "https://api.brightdata.com/datasets/v3/snapshots/"
+API_SERP     = f"{BD_API_BASE}/request"
+API_SCRAPE   = f"{BD_API_BASE}/datasets/v3/scrape"
+API_TRIGGER  = f"{BD_API_BASE}/datasets/v3/trigger"
+
+# Company URLs sent per dataset trigger call
+DATASET_BATCH_SIZE = int(os.getenv("BD_DATASET_BATCH_SIZE", "100"))
+
+# "merged": one unrestricted SERP query yields LinkedIn URL + website; "split": two restricted queries
+SERP_MODE = os.getenv("SERP_MODE", "merged").lower()
+# Hosts that are never a company's official site
+NOT_OFFICIAL_SITES = {
+    "linkedin", "facebook", "instagram", "twitter", "x", "youtube", "tiktok", "pinterest", "wikipedia",
+    "yelp", "crunchbase", "glassdoor", "indeed", "tripadvisor", "google", "bloomberg", "zoominfo",
+    "dnb", "trustpilot", "pagesjaunes", "societe", "pappers", "bbb", "yellowpages", "apple", "amazon",
+}
+MIN_SITE_SCORE = 0.5
 
 # LinkedIn API
 API_BASE = "https://api.linkedin.com/v2"
 
+class SerpError(RuntimeError):
+    """A SERP lookup that failed (transport error or non-2xx), as opposed to one with no match."""
+
+class PostError(RuntimeError):
+    """A post LinkedIn answered with an error: `status` is the HTTP status, `detail` its body."""
+
+    def __init__(self, status: int, detail: Any):
+        super().__init__(f"Member post failed: HTTP {status} – {detail}")
+        self.status = status
+        self.detail = detail
+
+_TLD = None
+
+def _tld(url: str):
+    """tldextract on the bundled suffix list (no network fetch); loaded on first use."""
+    global _TLD
+    if _TLD is None:
+        import tldextract
+        _TLD = tldextract.TLDExtract(suffix_list_urls=())
+    return _TLD(url)
+
+def _done(value: Any) -> Future:
+    f: Future = Future()
+    f.set_result(value)
+    return f
+
+def _then(fut: Future, fn: Callable[[Any], Any]) -> Future:
+    """Future resolved with fn(fut.result())."""
+    out: Future = Future()
+    def _cb(f: Future):
+        try:
+            out.set_result(fn(f.result()))
+        except Exception as e:
+            out.set_exception(e)
+    fut.add_done_callback(_cb)
+    return out
+
+def _gather(futures: List[Future]) -> Future:
+    """Future resolved with the merged dicts of all `futures`."""
+    out: Future = Future()
+    if not futures:
+        out.set_result({})
+        return out
+    remaining = [len(futures)]
+    lock = threading.Lock()
+    def _cb(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            try:
+                merged: Dict[str, Any] = {}
+                for f in futures:
+                    merged.update(f.result())
+                out.set_result(merged)
+            except Exception as e:
+                out.set_exception(e)
+    for f in futures:
+        f.add_done_callback(_cb)
+    return out
+
 class LinkedInClient:
     """
     All LinkedIn operations:
@@ -19,11 +99,38 @@ class LinkedInClient:
     - LinkedIn member ops (resolve member URN, create text post)
     """
 
-    def __init__(self, access_token: Optional[str] = None, member_urn: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, member_urn: Optional[str] = None,
+                 serp_cache: Optional[SerpCache] = None, poller: Optional[SnapshotPoller] = None,
+                 serp_mode: Optional[str] = None, urn_cache: Optional[TTLCache] = None):
         self.access_token = access_token or os.getenv("LINKEDIN_ACCESS_TOKEN")
         if not self.access_token:
             raise RuntimeError("LINKEDIN_ACCESS_TOKEN is missing in environment.")
         self._member_urn = member_urn
+        self._serp_cache = serp_cache
+        self._poller = poller
+        self._urn_cache = urn_cache
+        self.serp_mode = (serp_mode or SERP_MODE).lower()
+
+    # SERP cache and snapshot poller open SQLite stores: only built when Bright Data is used
+    @property
+    def serp_cache(self) -> SerpCache:
+        if self._serp_cache is None:
+            self._serp_cache = SerpCache.from_env()
+        return self._serp_cache
+
+    @property
+    def poller(self) -> SnapshotPoller:
+        if self._poller is None:
+            self._poller = SnapshotPoller()
+        return self._poller
+
+    @property
+    def urn_cache(self) -> TTLCache:
+        """Member URNs resolved by earlier runs, per access token (LINKEDIN_CACHE_PATH)."""
+        if self._urn_cache is None:
+            self._urn_cache = SQLiteTTLCache(os.getenv("LINKEDIN_CACHE_PATH", os.path.join(".cache", "linkedin.sqlite")),
+                                             table="member_urns", ttl_secs=60 * 86400)
+        return self._urn_cache
 
     # ---------- LinkedIn headers ----------
     @property
@@ -38,58 +145,279 @@ class LinkedInClient:
     def business_to_profile_url(self, business_name: str) -> Optional[str]:
         return self._serp_first_linkedin_company(business_name)
 
+    def resolve_business(self, business_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        (LinkedIn company URL, website hint or None) using the configured SERP_MODE. In merged mode
+        a name whose unrestricted results have no LinkedIn link gets the site:linkedin.com query too.
+        """
+        if self.serp_mode == "merged":
+            li, website = self.resolve_via_serp(business_name)
+            if not li:
+                li = self._serp_first_linkedin_company(business_name)
+            return li, website
+        return self.business_to_profile_url(business_name), None
+
+    def resolve_via_serp(self, business_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        One unrestricted SERP query, organic results ranked once:
+        first linkedin.com/company link + best official-site candidate by domain similarity.
+        The website is "" when no candidate is convincing (caller may fall back to a dedicated query).
+        Raises SerpError when the query failed, so it is not mistaken for "no LinkedIn page".
+        """
+        query = business_name
+        cached = self.serp_cache.lookup(query)
+        if cached is not MISSING:
+            cached = cached or {}
+            return cached.get("linkedin") or None, cached.get("website", "")
+
+        organic = self._serp_organic(query)
+
+        li, website = None, ""
+        best = MIN_SITE_SCORE
+        for pos, item in enumerate(organic):
+            link = item.get("link") or item.get("url")
+            if not link or not link.startswith("http"):
+                continue
+            if "linkedin.com/company" in link:
+                li = li or link.split("?")[0]
+                continue
+            score = self._site_score(business_name, link) - 0.03 * pos
+            if score > best:
+                best, website = score, link.split("?")[0]
+
+        if not li:
+            log.info(f"[SERP] No linkedin.com/company result for: {business_name}")
+        log.debug(f"[SERP] {business_name} → {li} / {website or '-'}")
+        self.serp_cache.store(query, {"linkedin": li, "website": website} if (li or website) else None)
+        return li, website
+
+    def _site_score(self, business_name: str, link: str) -> float:
+        """0..1 similarity between the company name and the link's registered domain."""
+        ext = _tld(link)
+        label = ext.domain.lower()
+        if not label or label in NOT_OFFICIAL_SITES or "linkedin" in label:
+            return 0.0
+        name = canonical_name(business_name)
+        compact, dom = name.replace(" ", ""), label.replace("-", "")
+        if not compact:
+            return 0.0
+        if compact == dom:
+            return 1.0
+        score = SequenceMatcher(None, compact, dom).ratio()
+        if compact in dom or dom in compact:
+            score = max(score, 0.8)
+        elif any(len(t) > 3 and t in dom for t in name.split()):
+            score = max(score, 0.6)
+        return score
+
     def _serp_first_linkedin_company(self, business_name: str) -> Optional[str]:
         query = f"site:linkedin.com/company {business_name}"
-        payload = {"zone": SERP_ZONE, "url": google_query_url(query), "format": "raw"}
-
-        for attempt in range(4):
-            r = SESSION.post(API_SERP, json=payload, timeout=60)
-            if r.ok:
-                try:
-                    data = r.json()
-                except Exception:
-                    data = json.loads(r.text or "{}")
-
-                for item in data.get("organic", []):
-                    link = item.get("link") or item.get("url")
-                    if link and "linkedin.com/company" in link:
-                        clean = link.split("?")[0]
-                        log.debug(f"[SERP] {business_name} → {clean}")
-                        return clean
-                log.info(f"[SERP] No linkedin.com/company result for: {business_name}")
-                return None
-
-            log.warning(f"[SERP] attempt {attempt+1} HTTP {r.status_code}; backing off…")
-            backoff_sleep(attempt)
+        cached = self.serp_cache.lookup(query)
+        if cached is not MISSING:
+            log.debug(f"[SERP] cache hit: {business_name} → {cached}")
+            return cached
 
-        log.error(f"[SERP] failed for: {business_name}")
+        organic = self._serp_organic(query)
+        for item in organic:
+            link = item.get("link") or item.get("url")
+            if link and "linkedin.com/company" in link:
+                clean = link.split("?")[0]
+                log.debug(f"[SERP] {business_name} → {clean}")
+                self.serp_cache.store(query, clean)
+                return clean
+        log.info(f"[SERP] No linkedin.com/company result for: {business_name}")
+        self.serp_cache.store(query, None)
         return None
 
     def find_official_website_via_serp(self, business_name: str) -> Optional[str]:
         query = f'{business_name} official site -site:linkedin.com'
-        payload = {"zone": SERP_ZONE, "url": google_query_url(query), "format": "raw"}
-        for attempt in range(4):
-            r = SESSION.post(API_SERP, json=payload, timeout=60)
-            if r.ok:
-                try:
-                    data = r.json()
-                except Exception:
-                    data = json.loads(r.text or "{}")
-                for item in data.get("organic", []):
-                    link = item.get("link") or item.get("url")
-                    if link and "linkedin.com" not in link and link.startswith("http"):
-                        return link.split("?")[0]
-                return None
-            backoff_sleep(attempt)
+        cached = self.serp_cache.lookup(query)
+        if cached is not MISSING:
+            return cached
+
+        try:
+            organic = self._serp_organic(query)
+        except SerpError as e:
+            log.warning(f"[SERP] website lookup failed for {business_name}: {e}")
+            return None
+        for item in organic:
+            link = item.get("link") or item.get("url")
+            if link and "linkedin.com" not in link and link.startswith("http"):
+                clean = link.split("?")[0]
+                self.serp_cache.store(query, clean)
+                return clean
+        self.serp_cache.store(query, None)
         return None
 
+    def _serp_organic(self, query: str) -> List[Dict[str, Any]]:
+        """Organic results for `query`; raises SerpError when the SERP call kept failing."""
+        import requests
+        payload = {"zone": SERP_ZONE, "url": google_query_url(query), "format": "raw"}
+        try:
+            # paid per successful call: retry throttling, 5xx answers and failed connects, but not a
+            # read timeout (the query may have run and been billed)
+            r = http.request("POST", API_SERP, "serp", retry_exceptions=(requests.exceptions.ConnectTimeout,),
+                             json=payload, timeout=60)
+        except requests.RequestException as e:
+            raise SerpError(f"request failed: {type(e).__name__}: {e}") from e
+        if not r.ok:
+            raise SerpError(f"HTTP {r.status_code}: {(r.text or '')[:200]}")
+        try:
+            data = r.json()
+        except Exception:
+            data = json.loads(r.text or "{}")
+        return data.get("organic", []) or []
+
     # ---------- Company scrape via Bright Data ----------
     def collect_company_payload(self, linkedin_company_url: str) -> Dict[str, Any]:
         return self._collect_linkedin_company(linkedin_company_url)
 
+    def collect_company_payloads(self, linkedin_company_urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk variant of collect_company_payload: one trigger + one snapshot per
+        DATASET_BATCH_SIZE URLs. Returns {input_url: payload}; inputs with no
+        matching record get a {"status": "error"|"pending", ...} payload.
+        """
+        return self.settle_payloads(self.collect_company_payloads_async(linkedin_company_urls).result())
+
+    def collect_company_payloads_async(self, linkedin_company_urls: Iterable[str]) -> Future:
+        """
+        Trigger (or resume a snapshot persisted by an earlier run) and return at once.
+        The Future resolves to {input_url: payload} once every batch snapshot is ready;
+        pass it through settle_payloads() to retry URLs whose whole batch failed.
+        """
+        urls = list(dict.fromkeys(u for u in linkedin_company_urls if u))
+        futures = [self._trigger_batch(urls[i:i + DATASET_BATCH_SIZE]) for i in range(0, len(urls), DATASET_BATCH_SIZE)]
+        return _gather(futures)
+
+    def settle_payloads(self, payloads: Dict[str, Dict[str, Any]], pool: Optional[Executor] = None,
+                        timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Re-collect, per URL, the inputs whose batch trigger failed outright: in `pool` when given,
+        waiting at most `timeout` seconds (URLs not done by then get a pending payload).
+        A URL whose re-collection raises gets an error payload; the rest of the batch is kept.
+        """
+        failed = [url for url, payload in payloads.items() if payload.get("batch_failed")]
+        if not failed:
+            return payloads
+        if pool is None:
+            for url in failed:
+                payloads[url] = self._settle_one(url)
+            return payloads
+        futures = {pool.submit(self._settle_one, url): url for url in failed}
+        done, late = wait(futures, timeout=timeout)
+        for fut in done:
+            payloads[futures[fut]] = fut.result()
+        for fut in late:
+            fut.cancel()
+            payloads[futures[fut]] = {"status": "pending", "detail": f"not collected within {timeout:.0f}s"}
+        if late:
+            log.warning(f"[BD] {len(late)} of {len(failed)} per-URL fallbacks not done in time")
+        return payloads
+
+    def _settle_one(self, url: str) -> Dict[str, Any]:
+        try:
+            return self._collect_linkedin_company(url)
+        except Exception as e:
+            log.error(f"[BD] {url} failed: {e}")
+            return {"status": "error", "detail": f"{type(e).__name__}: {e}"}
+
+    def close(self):
+        """Stop background snapshot polling (pending snapshots stay persisted for the next run)."""
+        if self._poller is not None:
+            self._poller.close()
+
+    @staticmethod
+    def _batch_key(urls: List[str]) -> str:
+        keys = sorted(LinkedInClient._url_key(u) for u in urls)
+        return f"{DATASET_ID}:" + hashlib.sha1("\n".join(keys).encode()).hexdigest()
+
+    def _trigger_batch(self, urls: List[str]) -> Future:
+        import requests
+        key = self._batch_key(urls)
+        snap = self.poller.pending_for(key)
+        if snap:
+            log.info(f"[BD] resuming snapshot {snap} from an earlier run ({len(urls)} urls)")
+        else:
+            try:
+                snap, err = self._trigger(urls)
+            except requests.RequestException as e:
+                snap, err = None, {"status": "error", "detail": str(e)}
+            if not snap:
+                log.warning(f"[BD] batch of {len(urls)} failed, will fall back to per-URL scrape: {err}")
+                return _done({u: {"batch_failed": True, **err} for u in urls})
+            log.info(f"[BD] batch trigger snapshot: {snap} ({len(urls)} urls)")
+
+        return _then(self.poller.submit(snap, key=key), lambda resp: self._split_batch(urls, resp))
+
+    def _trigger(self, urls: List[str]):
+        """POST the trigger call; returns (snapshot_id, None) or (None, error dict)."""
+        import requests
+        body = {"dataset_id": DATASET_ID, "input": [{"url": u} for u in urls]}
+        # a trigger Bright Data accepted is billed: only retry throttling and failed connects
+        # (a 5xx still slows the endpoint down, see ratelimit.request)
+        r = http.request("POST", API_TRIGGER, "trigger", retry_on=(429,),
+                         retry_exceptions=(requests.exceptions.ConnectTimeout,), json=body, timeout=60)
+        if r.status_code in (200, 201, 202):
+            try:
+                snap = r.json().get("snapshot_id")
+            except Exception:
+                snap = None
+            if snap:
+                return snap, None
+            return None, {"status": "error", "detail": "no snapshot_id", "body": (r.text or "")[:600]}
+        log.warning(f"[BD] trigger HTTP {r.status_code}")
+        return None, {"status": "error", "http": r.status_code, "body": (r.text or "")[:600]}
+
+    def _split_batch(self, urls: List[str], resp: Any) -> Dict[str, Dict[str, Any]]:
+        if isinstance(resp, dict) and resp.get("status") in ("error", "pending"):
+            return {u: dict(resp) for u in urls}
+        return self._split_records(urls, resp)
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        u = (url or "").strip().lower().split("?")[0].split("#")[0].rstrip("/")
+        for prefix in ("https://", "http://", "www."):
+            if u.startswith(prefix):
+                u = u[len(prefix):]
+        return u
+
+    def _split_records(self, urls: List[str], resp: Any) -> Dict[str, Dict[str, Any]]:
+        """Match snapshot records back to the input URLs they were scraped for."""
+        if isinstance(resp, dict) and "raw" in resp:
+            records = []
+            for line in (resp["raw"] or "").splitlines():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+        elif isinstance(resp, dict):
+            records = next((resp[c] for c in ("results", "data", "items", "payload", "records")
+                            if isinstance(resp.get(c), list)), [resp])
+        else:
+            records = resp if isinstance(resp, list) else []
+
+        by_key = {self._url_key(u): u for u in urls}
+        out: Dict[str, Dict[str, Any]] = {}
+        for rec in records:
+            if not isinstance(rec, dict):
+                continue
+            inp = rec.get("input") if isinstance(rec.get("input"), dict) else {}
+            for cand in (inp.get("url"), rec.get("input_url"), rec.get("url"), rec.get("company_url")):
+                src = by_key.get(self._url_key(cand)) if cand else None
+                if src and src not in out:
+                    out[src] = {"status": "error", "detail": rec.get("error"), **rec} if rec.get("error") else rec
+                    break
+
+        if len(urls) == 1 and not out and records and isinstance(records[0], dict):
+            out[urls[0]] = records[0]
+        for u in urls:
+            out.setdefault(u, {"status": "error", "detail": "no record returned for url"})
+        return out
+
     def _collect_linkedin_company(self, linkedin_company_url: str) -> Dict[str, Any]:
         for attempt in range(2):
-            resp = self._scrape_now(linkedin_company_url)
+            resp = self._one_record(linkedin_company_url, self._scrape_now(linkedin_company_url))
             if resp.get("status") not in ("error", "pending"):
                 return resp
             log.warning(f"[BD] scrape error/pend (try {attempt+1}): {resp}")
@@ -97,7 +425,7 @@ class LinkedInClient:
 
         log.info("[BD] switching to trigger fallback…")
         for attempt in range(2):
-            resp = self._scrape_trigger(linkedin_company_url)
+            resp = self._one_record(linkedin_company_url, self._scrape_trigger(linkedin_company_url))
             if resp.get("status") not in ("error", "pending"):
                 return resp
             log.warning(f"[BD] trigger error/pend (try {attempt+1}): {resp}")
@@ -105,9 +433,23 @@ class LinkedInClient:
 
         return {"status": "error", "detail": "Both scrape and trigger failed"}
 
+    def _one_record(self, url: str, resp: Any) -> Dict[str, Any]:
+        """Dataset endpoints answer with a list of records; keep the one for `url`."""
+        if isinstance(resp, list):
+            return self._split_records([url], resp)[url]
+        return resp
+
     def _scrape_now(self, url: str) -> Dict[str, Any]:
+        key = self._batch_key([url])
+        snap = self.poller.pending_for(key)
+        if snap:
+            log.info(f"[BD] resuming snapshot {snap} from an earlier run")
+            return self._poll_snapshot(snap, key=key)
+
+        import requests
         body = {"dataset_id": DATASET_ID, "input": [{"url": url}]}
-        r = SESSION.post(API_SCRAPE, json=body, timeout=60)
+        r = http.request("POST", API_SCRAPE, "scrape", retry_on=(429,),
+                         retry_exceptions=(requests.exceptions.ConnectTimeout,), json=body, timeout=60)
         if r.status_code == 200:
             try:
                 return r.json()
@@ -116,12 +458,20 @@ class LinkedInClient:
         if r.status_code == 202:
             snap = r.json().get("snapshot_id")
             log.info(f"[BD] snapshot queued: {snap}")
-            return self._poll_snapshot(snap)
+            return self._poll_snapshot(snap, key=key)
         return {"status": "error", "http": r.status_code, "body": (r.text or "")[:600]}
 
     def _scrape_trigger(self, url: str) -> Dict[str, Any]:
+        key = self._batch_key([url])
+        snap = self.poller.pending_for(key)
+        if snap:
+            log.info(f"[BD] resuming snapshot {snap} from an earlier run")
+            return self._poll_snapshot(snap, key=key)
+
+        import requests
         body = {"dataset_id": DATASET_ID, "input": [{"url": url}]}
-        r = SESSION.post(API_TRIGGER, json=body, timeout=60)
+        r = http.request("POST", API_TRIGGER, "trigger", retry_on=(429,),
+                         retry_exceptions=(requests.exceptions.ConnectTimeout,), json=body, timeout=60)
         if r.status_code in (200, 201, 202):
             snap = None
             try:
@@ -130,70 +480,49 @@ class LinkedInClient:
                 pass
             if snap:
                 log.info(f"[BD] trigger snapshot: {snap}")
-                return self._poll_snapshot(snap)
+                return self._poll_snapshot(snap, key=key)
             try:
                 return r.json()
             except Exception:
                 return {"raw": r.text}
         return {"status": "error", "http": r.status_code, "body": (r.text or "")[:600]}
 
-    def _poll_snapshot(self, snapshot_id: str, ttl_secs: int = 60) -> Dict[str, Any]:
-        deadline = time.time() + ttl_secs
-        while time.time() < deadline:
-            s = requests.get(f"{API_SNAPSHOT}{snapshot_id}", timeout=60)
-            if s.status_code == 200:
-                try:
-                    return s.json()
-                except Exception:
-                    return {"raw": s.text}
-            time.sleep(3)
-        return {"status": "pending", "snapshot_id": snapshot_id}
+    def _poll_snapshot(self, snapshot_id: str, ttl_secs: int = 60, key: Optional[str] = None) -> Dict[str, Any]:
+        """Wait up to ttl_secs; the poller keeps tracking (and persisting) the snapshot afterwards."""
+        try:
+            return self.poller.submit(snapshot_id, key=key).result(timeout=ttl_secs)
+        except FutureTimeout:
+            return {"status": "pending", "snapshot_id": snapshot_id}
 
     # ---------- Website extraction from payload ----------
     def extract_company_website(self, company_payload: Dict[str, Any]) -> str:
-        return self._extract_company_website(company_payload)
-
-    def _first(self, obj, keys):
-        for k in keys:
-            if isinstance(obj, dict) and obj.get(k):
-                return obj[k]
-        return None
-
-    def _drill_for_website(self, obj) -> str:
-        if not isinstance(obj, dict):
-            return ""
-        site = self._first(obj, ("website", "company_website", "site", "official_website", "companyWebsite", "siteUrl"))
-        if site:
-            return str(site).strip()
-        for container in ("results", "data", "items", "payload", "records"):
-            arr = obj.get(container)
-            if isinstance(arr, list) and arr:
-                first = arr[0]
-                site = self._first(first, ("website", "company_website", "site", "official_website", "companyWebsite", "siteUrl"))
-                if site:
-                    return str(site).strip()
-        return ""
-
-    def _extract_company_website(self, company_payload: Dict[str, Any]) -> str:
-        site = self._drill_for_website(company_payload)
-        if site and not site.startswith("http"):
-            site = "https://" + site.lstrip("/")
-        return site
+        return project_company(company_payload).website
 
     # ---------- High-level enrichment ----------
     def enrich_business(self, business_name: str) -> Dict[str, Any]:
-        li = self.business_to_profile_url(business_name)
+        li, site_hint = self.resolve_business(business_name)
+        payload = self.collect_company_payload(li) if li else {}
+        return self.finish_enrichment(business_name, li, payload, site_hint)
+
+    def finish_enrichment(self, business_name: str, li: Optional[str],
+                          payload: Union[Dict[str, Any], CompanyProfile], site_hint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Website + status + company profile from an already resolved LinkedIn URL and its company
+        payload, raw or already projected with records.project_company (batch-friendly).
+        site_hint (from resolve_via_serp) replaces the dedicated website SERP query when set.
+        """
+        profile = payload if isinstance(payload, CompanyProfile) else project_company(payload)
         if not li:
-            website = self.find_official_website_via_serp(business_name) or ""
+            website = site_hint or self.find_official_website_via_serp(business_name) or ""
             return {
                 "business_name": business_name,
                 "linkedin_company_url": "",
                 "website": website,
-                "status": "no_linkedin_but_site_fallback"
+                "status": "no_linkedin_but_site_fallback",
+                "profile": profile,
             }
 
-        payload = self.collect_company_payload(li)
-        website = self.extract_company_website(payload)
+        website = profile.website or site_hint
         if not website:
             website = self.find_official_website_via_serp(business_name) or ""
 
@@ -201,7 +530,8 @@ class LinkedInClient:
             "business_name": business_name,
             "linkedin_company_url": li,
             "website": website,
-            "status": "ok" if website else "no_website_found"
+            "status": "ok" if website else "no_website_found",
+            "profile": profile,
         }
 
     # ---------- LinkedIn posting ----------
@@ -212,23 +542,33 @@ class LinkedInClient:
         if env_urn:
             self._member_urn = env_urn
             return env_urn
+        token_key = hashlib.sha256(self.access_token.encode()).hexdigest()[:32]
+        cached = self.urn_cache.get(token_key)
+        if cached:
+            self._member_urn = cached
+            return cached
 
+        import requests
         try:
-            r = requests.get(f"{API_BASE}/me", headers=self.headers, timeout=20)
+            r = http.request("GET", f"{API_BASE}/me", "linkedin", session=requests,
+                             headers=self.headers, timeout=20)
             if r.status_code == 200:
                 pid = r.json().get("id")
                 if pid:
                     self._member_urn = f"urn:li:person:{pid}"
+                    self.urn_cache.set(token_key, self._member_urn)
                     return self._member_urn
         except Exception:
             pass
 
-        r2 = requests.get(f"{API_BASE}/userinfo", headers=self.headers, timeout=20)
+        r2 = http.request("GET", f"{API_BASE}/userinfo", "linkedin", session=requests,
+                          headers=self.headers, timeout=20)
         r2.raise_for_status()
         sub = r2.json().get("sub")
         if not sub:
             raise RuntimeError("Unable to resolve member id from /userinfo.")
         self._member_urn = f"urn:li:person:{sub}"
+        self.urn_cache.set(token_key, self._member_urn)
         return self._member_urn
 
     def create_text_post(self, text: str, visibility: str = "PUBLIC") -> Dict[str, Any]:
@@ -244,11 +584,39 @@ class LinkedInClient:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": visibility},
         }
-        r = requests.post(f"{API_BASE}/ugcPosts", headers=self.headers, json=payload, timeout=30)
+        import requests
+        # only retry what cannot have created a post: throttling and failed connects
+        r = http.request("POST", f"{API_BASE}/ugcPosts", "linkedin", session=requests, retry_on=(429,),
+                         retry_exceptions=(requests.exceptions.ConnectTimeout,),
+                         headers=self.headers, json=payload, timeout=30)
         if r.status_code >= 400:
             try:
                 detail = r.json()
             except Exception:
                 detail = r.text
-            raise RuntimeError(f"Member post failed: HTTP {r.status_code} – {detail}")
-        return r.json()
+            raise PostError(r.status_code, detail)
+        try:
+            res = r.json() if r.content else {}
+        except ValueError:
+            res = {}
+        if not res.get("id") and r.headers.get("X-RestLi-Id"):  # ugcPosts may answer 201 with only the header
+            res["id"] = r.headers["X-RestLi-Id"]
+        return res
+
+    def recent_posts(self, count: int = 20) -> List[Dict[str, Any]]:
+        """
+        The member's latest posts as {"id", "text", "created"} (epoch seconds), newest first.
+        Needs the r_member_social scope; raises when LinkedIn refuses the lookup.
+        """
+        import requests
+        from urllib.parse import quote
+        author = quote(self.get_member_urn(), safe="")
+        r = http.request("GET", f"{API_BASE}/ugcPosts?q=authors&authors=List({author})&sortBy=CREATED&count={count}",
+                         "linkedin", session=requests, headers=self.headers, timeout=20)
+        r.raise_for_status()
+        posts = []
+        for el in r.json().get("elements", []) or []:
+            share = (el.get("specificContent") or {}).get("com.linkedin.ugc.ShareContent") or {}
+            posts.append({"id": el.get("id"), "text": (share.get("shareCommentary") or {}).get("text", ""),
+                          "created": ((el.get("created") or {}).get("time") or 0) / 1000})
+        return posts
@@ -0,0 +1,140 @@
+import os, json, time, zlib, sqlite3, threading
+from typing import Dict, Any, Optional, Tuple
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+CODECS = ("zstd", "gzip")
+
+class PageStore:
+    """
+    On-disk copy of crawled pages for conditional revalidation (If-None-Match / If-Modified-Since).
+    - one SQLite row per URL: compressed body (zstd if installed, else gzip), ETag, Last-Modified,
+      and the parse result, so a 304 needs neither decompression nor parsing
+    - rows not fetched or revalidated for `max_age_secs` are dropped; when the stored bodies exceed
+      `max_bytes`, least recently validated pages go first
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 2**20, max_age_secs: float = 30 * 86400,
+                 codec: Optional[str] = None):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        codec = (codec or "auto").lower()
+        if codec == "auto":
+            codec = "zstd" if _zstd() else "gzip"
+        if codec not in CODECS:
+            raise ValueError(f"Unknown page codec: {codec} (use one of {', '.join(CODECS)} or auto)")
+        if codec == "zstd" and not _zstd():
+            raise RuntimeError("zstd page compression needs zstandard: pip install zstandard")
+        self.codec = codec
+        self.max_bytes = max_bytes
+        self.max_age_secs = max_age_secs
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                         "encoding TEXT, codec TEXT, body BLOB, size INTEGER, parsed TEXT, ts REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_ts ON pages(ts)")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["PageStore"]:
+        if os.getenv("PAGE_STORE", "1").lower() in ("0", "false", "off", "no"):
+            return None
+        return cls(os.getenv("PAGE_STORE_PATH", os.path.join(".cache", "pages.sqlite")),
+                   max_bytes=int(float(os.getenv("PAGE_STORE_MAX_MB", "512")) * 2**20),
+                   max_age_secs=float(os.getenv("PAGE_STORE_MAX_AGE_DAYS", "30")) * 86400,
+                   codec=os.getenv("PAGE_STORE_CODEC"))
+
+    # ---------- reads ----------
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for `url` ({} when nothing usable is stored)."""
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified, ts FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row or time.time() - row[2] > self.max_age_secs:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def parsed(self, url: str, key: str) -> Optional[Dict[str, Any]]:
+        """Stored parse result for `url`, if it was made with the same `key` (backend + base URL)."""
+        with self._lock:
+            row = self._db.execute("SELECT parsed FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row or not row[0]:
+            return None
+        data = json.loads(row[0])
+        return data["result"] if data.get("key") == key else None
+
+    def body(self, url: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """(raw body, encoding) of the stored page, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT body, codec, encoding FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        blob, codec, encoding = row
+        if codec == "zstd":
+            zstd = _zstd()
+            if zstd is None:
+                return None
+            return zstd.ZstdDecompressor().decompress(blob), encoding
+        return zlib.decompress(blob, wbits=31), encoding
+
+    # ---------- writes ----------
+    def put(self, url: str, body: bytes, encoding: Optional[str], etag: Optional[str],
+            last_modified: Optional[str]) -> None:
+        if self.codec == "zstd":
+            blob = _zstd().ZstdCompressor(level=6).compress(body)
+        else:
+            co = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip container
+            blob = co.compress(body) + co.flush()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pages (url, etag, last_modified, encoding, codec, body, size, parsed, ts) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                             (url, etag, last_modified, encoding, self.codec, blob, len(blob), time.time()))
+            self._writes += 1
+            if self._writes % 64 == 1:
+                self._evict()
+            self._db.commit()
+
+    def set_parsed(self, url: str, key: str, result: Dict[str, Any]) -> None:
+        """Attach `result` to the stored page; pages that were not stored (no validators) cost no commit."""
+        with self._lock:
+            if not self._db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone():
+                return
+            self._db.execute("UPDATE pages SET parsed = ? WHERE url = ?",
+                             (json.dumps({"key": key, "result": result}, ensure_ascii=False), url))
+            self._db.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark `url` as just revalidated (304), keeping it out of age/size eviction a while longer."""
+        with self._lock:
+            self._db.execute("UPDATE pages SET ts = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._db.commit()
+
+    def _evict(self):
+        self._db.execute("DELETE FROM pages WHERE ts < ?", (time.time() - self.max_age_secs,))
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()
+        if total <= self.max_bytes:
+            return
+        drop = []
+        for url, size in self._db.execute("SELECT url, size FROM pages ORDER BY ts ASC"):
+            if total <= self.max_bytes * 0.9:  # free some headroom so we don't evict on every write
+                break
+            drop.append((url,))
+            total -= size
+        self._db.executemany("DELETE FROM pages WHERE url = ?", drop)
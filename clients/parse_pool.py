@@ -0,0 +1,36 @@
+import os, threading
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, Any, Optional
+from clients.html_extract import parse_page, pick_backend
+
+class ParsePool:
+    """
+    CPU stage of a crawl: fetch threads hand raw HTML bytes to worker processes
+    (regex scanning + parsing run outside the GIL) and get small result dicts back.
+
+    At most `max_pending` pages wait in the parse queue; when it is full, submit()
+    blocks the calling fetch thread until a worker frees a slot (backpressure).
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 backend: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 2
+        self.backend = pick_backend(backend)
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, body: bytes, encoding: Optional[str], base_url: str) -> Future:
+        self._slots.acquire()
+        try:
+            fut = self._executor.submit(parse_page, body, encoding, base_url, self.backend)
+        except Exception:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def parse(self, body: bytes, encoding: Optional[str], base_url: str) -> Dict[str, Any]:
+        return self.submit(body, encoding, base_url).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,132 @@
+import os, time, heapq, threading
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from cache import TTLCache, SQLiteTTLCache
+import ratelimit as http
+from utils import BD_API_BASE, log
+
+API_SNAPSHOT = f"{BD_API_BASE}/datasets/v3/snapshots/"
+
+# snapshot states Bright Data reports while the data is still being collected
+_BUILDING = ("running", "building", "starting", "collecting", "pending")
+
+class SnapshotPoller:
+    """
+    Polls many Bright Data snapshots from one background thread.
+    - submit() returns a Future resolved with the snapshot records
+    - poll interval grows per snapshot (initial_delay × factor, capped at max_delay)
+    - snapshots submitted with a key are persisted until collected, so a later run
+      can pick up `pending_for(key)` instead of triggering (and paying for) a new scrape
+    """
+
+    def __init__(self, store: Optional[TTLCache] = None, initial_delay: float = 2.0, factor: float = 1.6,
+                 max_delay: float = 30.0, timeout_secs: float = 1800.0):
+        self.store = store if store is not None else SQLiteTTLCache(
+            os.getenv("BD_SNAPSHOT_STORE", os.path.join(".cache", "snapshots.sqlite")),
+            table="pending_snapshots", ttl_secs=float(os.getenv("BD_SNAPSHOT_RETENTION_DAYS", "7")) * 86400)
+        self.initial_delay = initial_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.timeout_secs = timeout_secs
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._heap: List[Tuple[float, str]] = []
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ---------- public API ----------
+    def submit(self, snapshot_id: str, key: Optional[str] = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        with self._lock:
+            job = self._jobs.get(snapshot_id)
+            if job is None:
+                job = {"future": Future(), "key": key, "delay": self.initial_delay,
+                       "deadline": time.time() + self.timeout_secs}
+                self._jobs[snapshot_id] = job
+                heapq.heappush(self._heap, (time.time() + self.initial_delay, snapshot_id))
+                self._ensure_thread()
+                self._wake.notify()
+        if key:
+            self.store.set(key, snapshot_id)
+        if callback:
+            job["future"].add_done_callback(callback)
+        return job["future"]
+
+    def pending_for(self, key: str) -> Optional[str]:
+        """Snapshot id persisted for `key` by this or an earlier run, if still uncollected."""
+        return self.store.get(key)
+
+    def forget(self, key: str) -> None:
+        self.store.delete(key)
+
+    def outstanding(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def close(self) -> None:
+        """Stop polling; uncollected keyed snapshots stay in the store for the next run."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+            jobs, self._jobs, self._heap = self._jobs, {}, []
+        for snap, job in jobs.items():
+            if not job["future"].done():
+                job["future"].set_result({"status": "pending", "snapshot_id": snap})
+
+    # ---------- worker ----------
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="bd-snapshot-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._closed and (not self._heap or self._heap[0][0] > time.time()):
+                    self._wake.wait(timeout=(self._heap[0][0] - time.time()) if self._heap else None)
+                if self._closed:
+                    return
+                _, snap = heapq.heappop(self._heap)
+                job = self._jobs.get(snap)
+            if job is None or job["future"].done():
+                continue
+            self._poll_once(snap, job)
+
+    def _poll_once(self, snap: str, job: Dict[str, Any]):
+        result: Any = None
+        try:
+            # no retries here: a failed poll is simply rescheduled with a longer delay
+            r = http.request("GET", f"{API_SNAPSHOT}{snap}", "snapshot", retries=0,
+                             params={"format": "json"}, timeout=60)
+            if r.status_code == 200:
+                try:
+                    result = r.json()
+                except Exception:
+                    result = {"raw": r.text}
+                if isinstance(result, dict) and str(result.get("status", "")).lower() in _BUILDING:
+                    result = None
+            elif r.status_code in http.RETRY_STATUSES:
+                log.debug(f"[BD] snapshot {snap} HTTP {r.status_code}; polling again later")
+            elif r.status_code != 202:
+                log.warning(f"[BD] snapshot {snap} HTTP {r.status_code}")
+                result = {"status": "error", "http": r.status_code, "snapshot_id": snap, "body": (r.text or "")[:600]}
+        except Exception as e:
+            log.debug(f"[BD] snapshot {snap} poll failed: {e}")
+
+        if result is None and time.time() < job["deadline"]:
+            job["delay"] = min(job["delay"] * self.factor, self.max_delay)
+            with self._lock:
+                if snap in self._jobs:
+                    heapq.heappush(self._heap, (time.time() + job["delay"], snap))
+            return
+
+        with self._lock:
+            self._jobs.pop(snap, None)
+        if result is None:
+            log.info(f"[BD] snapshot {snap} still pending after {self.timeout_secs:.0f}s; kept for next run")
+            result = {"status": "pending", "snapshot_id": snap}
+        elif job["key"]:
+            self.store.delete(job["key"])
+        job["future"].set_result(result)
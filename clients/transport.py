@@ -0,0 +1,127 @@
+import os
+from typing import Dict, Mapping, Optional, Tuple
+from utils import BROWSER_UA, log
+
+# Content types worth downloading: pages to parse and sitemaps
+HTML_TYPES = ("text/html", "application/xhtml+xml", "text/xml", "application/xml", "text/plain")
+CHUNK = 64 * 1024
+
+class FetchResult:
+    """
+    What WebsiteClient needs from a response; `content` is already decompressed and capped.
+    `headers` is case-insensitive whatever the transport (httpx reports every name in lowercase).
+    """
+    __slots__ = ("status_code", "content", "encoding", "headers", "skipped")
+
+    def __init__(self, status_code: int, content: bytes = b"", encoding: Optional[str] = None,
+                 headers: Optional[Mapping[str, str]] = None, skipped: Optional[str] = None):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        from requests.structures import CaseInsensitiveDict
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.skipped = skipped  # "content_type" | "truncated" | None
+
+def _acceptable(content_type: Optional[str]) -> bool:
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    return not ctype or ctype in HTML_TYPES
+
+class Transport:
+    """
+    Website fetches for WebsiteClient: streamed reads that stop at `max_bytes` (of decompressed
+    body), and no download at all for non-HTML content types (PDFs, images, archives, …).
+    Transfer decompression (gzip/deflate, br/zstd when their packages are installed) is done
+    while streaming, so the cap also guards against compression bombs.
+    """
+
+    def __init__(self, max_bytes: int = 2 * 2**20):
+        self.max_bytes = max_bytes
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Tuple[float, float] = (5.0, 15.0)) -> FetchResult:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def _read(self, chunks, status: int, encoding: Optional[str], headers: Mapping[str, str]) -> FetchResult:
+        body, size = [], 0
+        for chunk in chunks:
+            body.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                return FetchResult(status, b"".join(body)[:self.max_bytes], encoding, headers, "truncated")
+        return FetchResult(status, b"".join(body), encoding, headers)
+
+class RequestsTransport(Transport):
+    """requests.Session with connection pools sized for crawls (many hosts, a few connections each)."""
+
+    def __init__(self, pool_hosts: int = 256, pool_per_host: int = 8, max_bytes: int = 2 * 2**20):
+        super().__init__(max_bytes)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": BROWSER_UA})
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, headers=None, timeout=(5.0, 15.0)) -> FetchResult:
+        with self.session.get(url, headers=headers, timeout=timeout, stream=True) as r:
+            hdrs = r.headers
+            if not _acceptable(r.headers.get("Content-Type")):
+                return FetchResult(r.status_code, b"", r.encoding, hdrs, "content_type")
+            return self._read(r.iter_content(CHUNK), r.status_code, r.encoding, hdrs)
+
+    def close(self):
+        self.session.close()
+
+class HttpxTransport(Transport):
+    """httpx.Client, HTTP/2 when the h2 package is installed (pip install "httpx[http2]")."""
+
+    def __init__(self, pool_hosts: int = 256, pool_per_host: int = 8, max_bytes: int = 2 * 2**20,
+                 http2: bool = True):
+        super().__init__(max_bytes)
+        import httpx
+        self._httpx = httpx
+        limits = httpx.Limits(max_connections=pool_hosts * pool_per_host, max_keepalive_connections=pool_hosts)
+        try:
+            self.client = httpx.Client(http2=http2, limits=limits, follow_redirects=True,
+                                       headers={"User-Agent": BROWSER_UA})
+        except ImportError:
+            log.warning("[GET] HTTP/2 needs the h2 package (pip install 'httpx[http2]'); using HTTP/1.1")
+            self.client = httpx.Client(limits=limits, follow_redirects=True, headers={"User-Agent": BROWSER_UA})
+
+    def get(self, url, headers=None, timeout=(5.0, 15.0)) -> FetchResult:
+        import requests
+        httpx = self._httpx
+        try:
+            with self.client.stream("GET", url, headers=headers,
+                                    timeout=httpx.Timeout(timeout[1], connect=timeout[0])) as r:
+                hdrs = r.headers
+                if not _acceptable(r.headers.get("Content-Type")):
+                    return FetchResult(r.status_code, b"", r.charset_encoding, hdrs, "content_type")
+                return self._read(r.iter_bytes(CHUNK), r.status_code, r.charset_encoding, hdrs)
+        # same exception types as the requests transport, so HostHealth classifies both alike
+        except httpx.ReadTimeout as e:
+            raise requests.exceptions.ReadTimeout(str(e)) from e
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.ProxyError) as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    def close(self):
+        self.client.close()
+
+def make_transport(name: Optional[str] = None) -> Transport:
+    """CRAWL_TRANSPORT (requests | httpx), CRAWL_POOL_HOSTS, CRAWL_POOL_PER_HOST, CRAWL_MAX_BYTES, CRAWL_HTTP2."""
+    name = (name or os.getenv("CRAWL_TRANSPORT", "requests")).lower()
+    kw = dict(pool_hosts=int(os.getenv("CRAWL_POOL_HOSTS", "256")),
+              pool_per_host=int(os.getenv("CRAWL_POOL_PER_HOST", "8")),
+              max_bytes=int(os.getenv("CRAWL_MAX_BYTES", str(2 * 2**20))))
+    if name == "httpx":
+        try:
+            return HttpxTransport(http2=os.getenv("CRAWL_HTTP2", "1") not in ("0", "false", "no"), **kw)
+        except ImportError:
+            log.warning("[GET] CRAWL_TRANSPORT=httpx but httpx is not installed; using requests")
+    elif name != "requests":
+        raise ValueError(f"Unknown crawl transport: {name} (use requests or httpx)")
+    return RequestsTransport(**kw)
@@ -1,48 +1,191 @@
-import re
-from typing import Dict, List, Set
+import os, re, time, socket, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Optional, Tuple, Any
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from utils import BROWSER, log
+from utils import LIMITS, log
+from clients.html_extract import parse_page, pick_backend, rank_contact_links
+from clients.parse_pool import ParsePool
+from clients.page_store import PageStore
+from clients.transport import Transport, make_transport
+from metrics import METRICS
 
-EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
-PHONE_RE = re.compile(r"(?:(?:\+?\d{1,3}[\s.\-]?)?(?:\(?\d{2,4}\)?[\s.\-]?)?\d{3,4}[\s.\-]?\d{4})")
 COMMON_PATHS = ["", "/contact", "/contact-us", "/contacts", "/about", "/about-us", "/impressum", "/support", "/help"]
+# (connect, read) timeouts: dead hosts fail on connect fast, slow-but-alive pages still get time to load
+CONNECT_TIMEOUT = float(os.getenv("CRAWL_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT    = float(os.getenv("CRAWL_READ_TIMEOUT", "15"))
+LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+
+class HostHealth:
+    """
+    Run-wide per-host circuit breaker for website fetches:
+    - unresolvable hosts are remembered (negative DNS cache), no request is attempted
+    - the circuit opens on the first connection failure, or after `max_read_timeouts` read timeouts
+    - open circuits close again after `cooldown_secs` (matters for long-running processes)
+    """
+
+    def __init__(self, max_read_timeouts: int = 2, cooldown_secs: float = 1800.0, check_dns: bool = True):
+        self.max_read_timeouts = max_read_timeouts
+        self.cooldown_secs = cooldown_secs
+        self.check_dns = check_dns
+        self._lock = threading.Lock()
+        self._open: Dict[str, float] = {}
+        self._resolved: Set[str] = set()
+        self._slow: Dict[str, int] = {}
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            opened = self._open.get(host)
+            if opened is not None:
+                if time.time() - opened < self.cooldown_secs:
+                    return False
+                del self._open[host]
+                self._slow.pop(host, None)
+            if not self.check_dns or host in self._resolved:
+                return True
+        try:
+            socket.getaddrinfo(urlparse("//" + host).hostname or host, None)
+        except (socket.gaierror, UnicodeError):
+            self._trip(host, "DNS lookup failed")
+            return False
+        with self._lock:
+            self._resolved.add(host)
+        return True
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._slow.pop(host, None)
+
+    def record_failure(self, host: str, exc: Exception):
+        import requests
+        if isinstance(exc, requests.exceptions.ReadTimeout):
+            with self._lock:
+                self._slow[host] = self._slow.get(host, 0) + 1
+                if self._slow[host] < self.max_read_timeouts:
+                    return
+            self._trip(host, f"{self.max_read_timeouts} read timeouts")
+        elif isinstance(exc, requests.exceptions.ConnectionError):
+            self._trip(host, type(exc).__name__)
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            opened = self._open.get(host)
+        return opened is not None and time.time() - opened < self.cooldown_secs
+
+    def _trip(self, host: str, reason: str):
+        with self._lock:
+            if host in self._open:
+                return
+            self._open[host] = time.time()
+        log.info(f"[GET] circuit open for {host} ({reason}); skipping its remaining pages")
+
+HOST_HEALTH = HostHealth(check_dns=os.getenv("CRAWL_DNS_CHECK", "1") not in ("0", "false", "no"))
 
 class WebsiteClient:
     """Generic website fetch & contact extraction client."""
 
-    def _safe_get(self, url: str) -> str:
+    def __init__(self, crawl_mode: Optional[str] = None, max_pages: int = 3, parallel: int = 3,
+                 health: Optional[HostHealth] = None, html_backend: Optional[str] = None,
+                 parse_workers: Optional[int] = None, page_store: Optional[PageStore] = None,
+                 transport: Optional[Transport] = None):
+        """
+        crawl_mode "smart" (default): homepage once → discovered contact pages (links, then sitemap.xml),
+        fetched `parallel` at a time, at most `max_pages`, stopping once emails and phones are found.
+        crawl_mode "exhaustive": every COMMON_PATHS page plus the homepage contact link.
+        html_backend: selectolax | lxml | bs4 (default: HTML_BACKEND env, else fastest installed).
+        parse_workers: > 0 parses pages in that many worker processes (default: PARSE_WORKERS env, 0 = in-thread).
+        page_store: on-disk page copies for conditional re-fetches (default: PageStore.from_env(), PAGE_STORE=0 disables).
+        transport: HTTP client for pages (default: make_transport(), i.e. CRAWL_TRANSPORT / CRAWL_POOL_* / CRAWL_MAX_BYTES).
+        """
+        self.crawl_mode = (crawl_mode or os.getenv("CRAWL_MODE", "smart")).lower()
+        self.max_pages = max_pages
+        self.parallel = max(1, parallel)
+        # shared by every site crawled at once: sized to the crawl cap, not to one site's `parallel`
+        self._pool = ThreadPoolExecutor(max_workers=max(self.parallel, LIMITS.crawl_slots),
+                                        thread_name_prefix="site-fetch")
+        self.health = health or HOST_HEALTH
+        self.html_backend = pick_backend(html_backend)
+        workers = int(os.getenv("PARSE_WORKERS", "0")) if parse_workers is None else parse_workers
+        self.parse_pool = ParsePool(workers, backend=self.html_backend) if workers > 0 else None
+        self.pages = page_store if page_store is not None else PageStore.from_env()
+        self.transport = transport or make_transport()
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.transport.close()
+        if self.parse_pool:
+            self.parse_pool.close()
+
+    def _fetch(self, url: str, parse_key: Optional[str] = None
+               ) -> Optional[Tuple[bytes, Optional[str], Optional[Dict[str, Any]]]]:
+        """
+        I/O stage: (raw body, declared encoding, stored parse result) for a 2xx non-empty response, else None.
+        Non-HTML responses come back empty (not downloaded); bodies over CRAWL_MAX_BYTES are cut there.
+        Pages in the PageStore are revalidated with If-None-Match/If-Modified-Since; on a 304 the stored
+        parse result for `parse_key` is returned (body b"") or, failing that, the stored body.
+        """
+        host = urlparse(url).netloc.lower()
+        if not self.health.allow(host):
+            METRICS.count("crawl", "skipped_dead_host")
+            return None
+        headers = self.pages.validators(url) if self.pages else {}
+        t0 = time.perf_counter()
         try:
-            resp = BROWSER.get(url, timeout=20)
-            if 200 <= resp.status_code < 300 and resp.text:
-                return resp.text
+            with LIMITS.crawl:
+                resp = self.transport.get(url, headers, (CONNECT_TIMEOUT, READ_TIMEOUT))
+            self.health.record_success(host)
+            METRICS.observe("crawl", time.perf_counter() - t0, resp.status_code, len(resp.content))
+            if resp.skipped:
+                METRICS.count("crawl", f"skipped_{resp.skipped}")
         except Exception as e:
+            METRICS.observe("crawl", time.perf_counter() - t0, type(e).__name__)
+            self.health.record_failure(host, e)
             log.debug(f"[GET] {url} failed: {e}")
-        return ""
-
-    def _extract_from_html(self, html: str, base_url: str = "") -> Dict[str, Set[str] | str | None]:
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text("\n", strip=True)
-
-        emails = set(EMAIL_RE.findall(text))
-        phones = set(PHONE_RE.findall(text))
-
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
-            if href.lower().startswith("mailto:"):
-                emails.add(href.split(":", 1)[1])
-            if href.lower().startswith("tel:"):
-                phones.add(href.split(":", 1)[1])
-
-        contact_link = None
-        for a in soup.find_all("a", href=True):
-            txt = (a.get_text() or "").lower()
-            href = a["href"]
-            if any(k in txt for k in ["contact", "support", "help"]) and not href.startswith("mailto:"):
-                contact_link = urljoin(base_url, href)
-                break
+            return None
+
+        if resp.status_code == 304 and headers:
+            self.pages.touch(url)
+            parsed = self.pages.parsed(url, parse_key) if parse_key else None
+            if parsed is not None:
+                return b"", None, parsed
+            stored = self.pages.body(url)
+            return (stored[0], stored[1], None) if stored else None
+        if 200 <= resp.status_code < 300 and resp.content:
+            if self.pages:
+                etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                if (etag or modified) and resp.skipped != "truncated":
+                    self.pages.put(url, resp.content, resp.encoding, etag, modified)
+                elif headers:
+                    self.pages.delete(url)
+            return resp.content, resp.encoding, None
+        return None
+
+    def _safe_get(self, url: str) -> str:
+        got = self._fetch(url)
+        if not got:
+            return ""
+        body, encoding, _ = got
+        try:
+            return body.decode(encoding or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
 
-        return {"emails": emails, "phones": phones, "contact_link": contact_link}
+    def _page(self, url: str, base_url: str) -> Optional[Dict[str, Any]]:
+        """Fetch + parse one page; parsing runs in the ParsePool when one is configured, and is skipped on a 304."""
+        key = f"{self.html_backend}|{base_url}"
+        got = self._fetch(url, key)
+        if not got:
+            return None
+        body, encoding, parsed = got
+        if parsed is not None:
+            return parsed
+        with METRICS.timed("parse"):
+            if self.parse_pool:
+                parsed = self.parse_pool.parse(body, encoding, base_url)
+            else:
+                parsed = parse_page(body, encoding, base_url, self.html_backend)
+        if self.pages:
+            self.pages.set_parsed(url, key, parsed)
+        return parsed
 
     def _normalize_site(self, url: str) -> str:
         if not url:
@@ -52,35 +195,70 @@ class WebsiteClient:
             u = "https://" + u.lstrip("/")
         return u.rstrip("/")
 
+    def _sitemap_candidates(self, base: str) -> List[str]:
+        xml = self._safe_get(base + "/sitemap.xml")
+        if not xml:
+            return []
+        return rank_contact_links([("", loc) for loc in LOC_RE.findall(xml)], base)
+
     def fetch_site_contacts(self, website_url: str) -> Dict[str, List[str]]:
         site = self._normalize_site(website_url)
         if not site:
             return {"emails": [], "phones": []}
+        if self.crawl_mode == "exhaustive":
+            return self._crawl_exhaustive(site)
+        return self._crawl_smart(site)
 
+    def _crawl_smart(self, site: str) -> Dict[str, List[str]]:
+        parsed = urlparse(site)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+
+        home = self._page(site, base)
+        if not home:
+            return {"emails": [], "phones": []}
+        emails, phones = set(home["emails"]), set(home["phones"])
+
+        candidates: List[str] = list(home["contact_links"])
+        if not candidates:
+            candidates = self._sitemap_candidates(base)
+        if not candidates:
+            candidates = [urljoin(base + "/", p.lstrip("/")) for p in ("/contact", "/contact-us", "/about")]
+        candidates = candidates[:self.max_pages]
+
+        for i in range(0, len(candidates), self.parallel):
+            if emails and phones:
+                break
+            wave = candidates[i:i + self.parallel]
+            for found in self._pool.map(lambda u: self._page(u, base), wave):
+                if found:
+                    emails.update(found["emails"])
+                    phones.update(found["phones"])
+
+        return self._clean(emails, phones)
+
+    def _crawl_exhaustive(self, site: str) -> Dict[str, List[str]]:
         emails, phones = set(), set()
         parsed = urlparse(site)
         base = f"{parsed.scheme}://{parsed.netloc}"
 
         for path in COMMON_PATHS:
             url = site if path == "" else urljoin(base + "/", path.lstrip("/"))
-            html = self._safe_get(url)
-            if not html:
+            found = self._page(url, base)
+            if not found:
                 continue
-            found = self._extract_from_html(html, base)
-            emails |= found["emails"]  # type: ignore
-            phones |= found["phones"]  # type: ignore
-
-        home_html = self._safe_get(site)
-        if home_html:
-            found = self._extract_from_html(home_html, base)
-            clink = found.get("contact_link")  # type: ignore
-            if clink:
-                html = self._safe_get(str(clink))
-                if html:
-                    f2 = self._extract_from_html(html, base)
-                    emails |= f2["emails"]  # type: ignore
-                    phones |= f2["phones"]  # type: ignore
+            emails.update(found["emails"])
+            phones.update(found["phones"])
+
+        home = self._page(site, base)
+        if home and home["contact_link"]:
+            f2 = self._page(str(home["contact_link"]), base)
+            if f2:
+                emails.update(f2["emails"])
+                phones.update(f2["phones"])
+
+        return self._clean(emails, phones)
 
+    def _clean(self, emails: Set[str], phones: Set[str]) -> Dict[str, List[str]]:
         clean_emails = sorted({e.strip().strip(".") for e in emails if "@" in e})
         clean_phones = sorted({re.sub(r"\s{2,}", " ", p).strip() for p in phones})
         return {"emails": clean_emails, "phones": clean_phones}
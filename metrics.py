@@ -0,0 +1,179 @@
+import os, json, time, bisect, threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+# latency buckets (seconds) shared by every stage; the last, implicit bucket is +Inf
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# stages Bright Data / Google bill per successful call
+BILLABLE = {"serp", "scrape", "trigger", "gemini"}
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus layout) with quantile estimates."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, secs: float):
+        self.counts[bisect.bisect_left(self.buckets, secs)] += 1
+        self.count += 1
+        self.sum += secs
+        self.max = max(self.max, secs)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+class _Stage:
+    def __init__(self):
+        self.latency = Histogram()
+        self.calls = 0
+        self.retries = 0
+        self.billable = 0
+        self.bytes = 0
+        self.status: Counter = Counter()
+        self.counters: Counter = Counter()
+
+class Metrics:
+    """
+    Run-wide, thread-safe call statistics per stage (serp, scrape, trigger, snapshot, linkedin,
+    crawl, gemini, plus pipeline waits): latency histogram, calls, retries, HTTP status (or
+    exception name) breakdown, bytes downloaded and billable calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+        self.started = time.time()
+
+    def _stage(self, name: str) -> _Stage:
+        st = self._stages.get(name)
+        if st is None:
+            st = self._stages[name] = _Stage()
+        return st
+
+    def observe(self, stage: str, secs: float, status: Any = None, nbytes: int = 0):
+        """One finished call (or attempt) of `stage`."""
+        with self._lock:
+            st = self._stage(stage)
+            st.latency.observe(secs)
+            st.calls += 1
+            st.bytes += nbytes or 0
+            if status is not None:
+                st.status[str(status)] += 1
+            if stage in BILLABLE and (status == "ok" or (isinstance(status, int) and 200 <= status < 300)):
+                st.billable += 1
+
+    def retry(self, stage: str):
+        with self._lock:
+            self._stage(stage).retries += 1
+
+    def count(self, stage: str, name: str, n: int = 1):
+        """Free-form counter, e.g. count("serp", "cache_hits")."""
+        with self._lock:
+            self._stage(stage).counters[name] += n
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time a block; the status is "ok" or the exception's class name."""
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - t0, status)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self.started = time.time()
+
+    # ---------- reports ----------
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for name, st in sorted(self._stages.items()):
+                h = st.latency
+                stages[name] = {
+                    "calls": st.calls, "retries": st.retries, "billable": st.billable, "bytes": st.bytes,
+                    "status": dict(st.status), **dict(st.counters),
+                    "latency_secs": {"total": round(h.sum, 3), "mean": round(h.sum / h.count, 4) if h.count else 0.0,
+                                     "p50": round(h.quantile(0.5), 4), "p90": round(h.quantile(0.9), 4),
+                                     "p99": round(h.quantile(0.99), 4),
+                                     "max": round(h.max, 4)},
+                }
+            return {"started": self.started, "wall_secs": round(time.time() - self.started, 3),
+                    "billable_calls": sum(s["billable"] for s in stages.values()), "stages": stages}
+
+    def write_json(self, path: str) -> Dict[str, Any]:
+        data = self.summary()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return data
+
+    def write_prometheus(self, path: str, prefix: str = "enrich"):
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        lines: List[str] = []
+        def family(name, kind, help_):
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        with self._lock:
+            stages = sorted(self._stages.items())
+            family("call_seconds", "histogram", "Call latency per stage")
+            for name, st in stages:
+                cum = 0
+                for le, n in zip(list(st.latency.buckets) + ["+Inf"], st.latency.counts):
+                    cum += n
+                    lines.append(f'{prefix}_call_seconds_bucket{{stage="{name}",le="{le}"}} {cum}')
+                lines.append(f'{prefix}_call_seconds_sum{{stage="{name}"}} {st.latency.sum:.6f}')
+                lines.append(f'{prefix}_call_seconds_count{{stage="{name}"}} {st.latency.count}')
+            for metric, attr, help_ in (("retries_total", "retries", "Retried attempts per stage"),
+                                        ("billable_calls_total", "billable", "Billable API calls per stage"),
+                                        ("downloaded_bytes_total", "bytes", "Response bytes per stage")):
+                family(metric, "counter", help_)
+                for name, st in stages:
+                    lines.append(f'{prefix}_{metric}{{stage="{name}"}} {getattr(st, attr)}')
+            family("responses_total", "counter", "Responses per stage and HTTP status / error")
+            for name, st in stages:
+                for status, n in sorted(st.status.items()):
+                    lines.append(f'{prefix}_responses_total{{stage="{name}",status="{status}"}} {n}')
+            family("events_total", "counter", "Other per-stage events (cache hits, …)")
+            for name, st in stages:
+                for event, n in sorted(st.counters.items()):
+                    lines.append(f'{prefix}_events_total{{stage="{name}",event="{event}"}} {n}')
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)  # atomic, so a scraper never reads a half-written file
+
+    def format_table(self) -> str:
+        """Short per-stage table for the end-of-run printout."""
+        data = self.summary()
+        rows = [f"{'stage':<14}{'calls':>7}{'retries':>8}{'billable':>9}{'p50 s':>8}{'p99 s':>8}{'total s':>9}{'MB':>8}"]
+        for name, s in data["stages"].items():
+            lat = s["latency_secs"]
+            rows.append(f"{name:<14}{s['calls']:>7}{s['retries']:>8}{s['billable']:>9}{lat['p50']:>8.2f}"
+                        f"{lat['p99']:>8.2f}{lat['total']:>9.1f}{s['bytes'] / 2**20:>8.2f}")
+        return "\n".join(rows)
+
+METRICS = Metrics()
@@ -0,0 +1,35 @@
+import re
+import unicodedata
+
+# Legal-form tokens dropped when comparing company names
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "kg", "ug", "sa", "sas", "sarl", "sasu", "eurl", "srl", "spa", "bv", "nv",
+    "oy", "ab", "as", "aps", "pty", "pte", "kk",
+}
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_DOTTED = re.compile(r"\b([a-z])\.(?=[a-z]\b)")
+# one or more trailing legal-form tokens, as long as at least one token remains before them
+_TRAILING_LEGAL = re.compile(r"(?<=\S)(?:\s+(?:" + "|".join(sorted(LEGAL_SUFFIXES | {"and"})) + r"))+$")
+
+def canonical_name(name: str) -> str:
+    """'ACME Fitness, Inc.' → 'acme fitness' (accents, case, punctuation and legal forms removed)."""
+    s = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode().lower()
+    s = s.replace("&", " and ")
+    s = _DOTTED.sub(r"\1", s)  # "s.a." → "sa.", "a.b.c." → "abc."
+    tokens = [t for t in _NON_ALNUM.split(s) if t]
+    while len(tokens) > 1 and (tokens[-1] in LEGAL_SUFFIXES or tokens[-1] == "and"):
+        tokens.pop()
+    return " ".join(tokens)
+
+def canonicalize_series(names) -> "pd.Series":
+    """Vectorized canonical_name over a pandas Series (same output, one pass per step over the column)."""
+    import pandas as pd
+    s = pd.Series(names, dtype="object").fillna("").astype(str)
+    s = (s.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+          .str.lower()
+          .str.replace("&", " and ", regex=False)
+          .str.replace(_DOTTED, r"\1", regex=True)
+          .str.replace(_NON_ALNUM, " ", regex=True)
+          .str.strip())
+    return s.str.replace(_TRAILING_LEGAL, "", regex=True)
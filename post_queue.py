@@ -0,0 +1,140 @@
+import os, time, hashlib, sqlite3, threading
+from typing import Dict, Any, Optional, List
+
+# queued → posting → posted | failed, with detours:
+#   unknown: the request may have reached LinkedIn; recent posts are checked before any retry
+#   review:  outcome unknown and recent posts could not be checked; a human must requeue or cancel
+STATUSES = ("queued", "posting", "unknown", "review", "posted", "failed", "cancelled")
+
+def text_key(text: str) -> str:
+    """Whitespace-insensitive identity of a post's text (one queue entry per text)."""
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()
+
+class PostQueue:
+    """
+    Durable LinkedIn post queue in one SQLite table. Every state change is committed before the
+    next step, so a crash never loses a post or forgets that a request may already have been sent.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.getenv("POST_QUEUE_PATH", os.path.join(".cache", "posts.sqlite"))
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, text_key TEXT UNIQUE, text TEXT, visibility TEXT,
+            status TEXT, not_before REAL, attempts INTEGER DEFAULT 0, linkedin_id TEXT, error TEXT,
+            created_at REAL, updated_at REAL, sent_at REAL, posted_at REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS posts_due ON posts(status, not_before)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS posts_posted ON posts(posted_at)")
+        self._db.commit()
+
+    def _update(self, post_id: int, **fields):
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE posts SET {cols} WHERE id = ?", (*fields.values(), post_id))
+            self._db.commit()
+
+    # ---------- producers ----------
+    def add(self, text: str, not_before: Optional[float] = None, visibility: str = "PUBLIC") -> Optional[int]:
+        """Queue `text`; returns its id, or None when the same text is already queued or posted."""
+        text = text.strip()
+        if not text:
+            raise ValueError("empty post text")
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO posts (text_key, text, visibility, status, not_before, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)", (text_key(text), text, visibility, not_before or now, now, now))
+            self._db.commit()
+            return cur.lastrowid if cur.rowcount else None
+
+    def requeue(self, post_id: int) -> bool:
+        """Back to `queued` (e.g. after checking a `review` post really is not on LinkedIn)."""
+        with self._lock:
+            cur = self._db.execute("UPDATE posts SET status = 'queued', not_before = ?, updated_at = ?, error = NULL"
+                                   " WHERE id = ? AND status IN ('review', 'failed', 'cancelled')",
+                                   (time.time(), time.time(), post_id))
+            self._db.commit()
+            return bool(cur.rowcount)
+
+    def cancel(self, post_id: int) -> bool:
+        with self._lock:
+            cur = self._db.execute("UPDATE posts SET status = 'cancelled', updated_at = ?"
+                                   " WHERE id = ? AND status IN ('queued', 'unknown', 'review', 'failed')",
+                                   (time.time(), post_id))
+            self._db.commit()
+            return bool(cur.rowcount)
+
+    # ---------- worker ----------
+    def recover(self) -> int:
+        """Posts left in `posting` by a crash may have been sent: mark them `unknown`."""
+        with self._lock:
+            cur = self._db.execute("UPDATE posts SET status = 'unknown', updated_at = ? WHERE status = 'posting'",
+                                   (time.time(),))
+            self._db.commit()
+            return cur.rowcount
+
+    def next_due(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Oldest post whose not_before has passed (without claiming it)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM posts WHERE status IN ('queued', 'unknown') AND not_before <= ?"
+                " ORDER BY not_before, id LIMIT 1", (now or time.time(),)).fetchone()
+        return dict(row) if row else None
+
+    def next_not_before(self) -> Optional[float]:
+        with self._lock:
+            (t,) = self._db.execute("SELECT MIN(not_before) FROM posts WHERE status IN ('queued', 'unknown')").fetchone()
+        return t
+
+    def mark_sending(self, post_id: int, attempts: int):
+        """Committed before the request goes out: a crash from here on leaves the post `unknown`."""
+        self._update(post_id, status="posting", attempts=attempts, sent_at=time.time())
+
+    def mark_posted(self, post_id: int, linkedin_id: Optional[str], note: Optional[str] = None):
+        self._update(post_id, status="posted", linkedin_id=linkedin_id, posted_at=time.time(), error=note)
+
+    def mark_unknown(self, post_id: int, retry_at: float, error: str):
+        self._update(post_id, status="unknown", not_before=retry_at, error=error)
+
+    def reschedule(self, post_id: int, retry_at: float, error: str):
+        """The request certainly did not create a post: retry it later as a fresh post."""
+        self._update(post_id, status="queued", not_before=retry_at, error=error)
+
+    def mark_review(self, post_id: int, error: str):
+        self._update(post_id, status="review", error=error)
+
+    def mark_failed(self, post_id: int, error: str):
+        self._update(post_id, status="failed", error=error)
+
+    # ---------- pacing ----------
+    def last_posted_at(self) -> Optional[float]:
+        with self._lock:
+            (t,) = self._db.execute("SELECT MAX(posted_at) FROM posts WHERE status = 'posted'").fetchone()
+        return t
+
+    def posted_since(self, since: float) -> List[float]:
+        """posted_at of every post published after `since`, oldest first."""
+        with self._lock:
+            rows = self._db.execute("SELECT posted_at FROM posts WHERE status = 'posted' AND posted_at > ?"
+                                    " ORDER BY posted_at", (since,)).fetchall()
+        return [r[0] for r in rows]
+
+    # ---------- reports ----------
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM posts GROUP BY status").fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def items(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        q, args = "SELECT * FROM posts", []
+        if status:
+            q, args = q + " WHERE status = ?", [status]
+        with self._lock:
+            rows = self._db.execute(q + " ORDER BY id DESC LIMIT ?", (*args, limit)).fetchall()
+        return [dict(r) for r in rows]
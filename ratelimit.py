@@ -0,0 +1,168 @@
+import os, time, random, threading
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Iterable, Type
+import utils
+from utils import LIMITS, log
+from metrics import METRICS
+
+if TYPE_CHECKING:  # imported lazily at runtime (see request())
+    import requests
+
+# Requests/second (and burst) per endpoint; override with e.g. BD_RATE_SERP=5 or BD_RATE_SERP=5:10
+DEFAULT_BUDGETS: Dict[str, Tuple[float, float]] = {
+    "serp":     (10.0, 20.0),
+    "scrape":   (2.0, 4.0),
+    "trigger":  (1.0, 2.0),
+    "snapshot": (5.0, 10.0),
+    "linkedin": (1.0, 2.0),
+    "gemini":   (1.0, 4.0),
+}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with AIMD rate adaptation:
+    429/5xx halve the rate (down to 5% of the budget), successes creep it back up.
+    pause() stops every caller until a Retry-After deadline has passed.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self):
+        with self._lock:
+            self.rate = max(self.max_rate * 0.05, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def pause(self, secs: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + secs)
+
+class RateLimiter:
+    """One TokenBucket per endpoint name, shared by every thread in the process."""
+
+    def __init__(self, budgets: Dict[str, Tuple[float, float]]):
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in budgets.items()}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        budgets = dict(DEFAULT_BUDGETS)
+        for name in budgets:
+            raw = os.getenv(f"BD_RATE_{name.upper()}")
+            if raw:
+                rate, _, burst = raw.partition(":")
+                budgets[name] = (float(rate), float(burst or rate))
+        return cls(budgets)
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self.buckets:
+            self.buckets[endpoint] = TokenBucket(*DEFAULT_BUDGETS["serp"])
+        return self.buckets[endpoint]
+
+LIMITER = RateLimiter.from_env()
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base·2^attempt))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after(resp: "requests.Response") -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if present."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _slots(endpoint: str):
+    if endpoint == "serp":
+        return LIMITS.serp
+    if endpoint in ("scrape", "trigger", "snapshot"):
+        return LIMITS.dataset
+    return None
+
+def request(method: str, url: str, endpoint: str, session=None, retries: int = 3,
+            retry_on: Iterable[int] = RETRY_STATUSES,
+            retry_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
+            **kwargs) -> "requests.Response":
+    """
+    session.request() behind the endpoint's rate budget and concurrency cap (session: utils.SESSION).
+    429/5xx (in `retry_on`) and transport errors (default: connection errors and timeouts)
+    are retried with jittered backoff, honouring Retry-After; the last response is returned
+    (or the last error raised). Any 429/5xx slows the endpoint down, retried or not.
+    """
+    import requests
+    session = session or utils.SESSION
+    if retry_exceptions is None:
+        retry_exceptions = (requests.ConnectionError, requests.Timeout)
+    bucket = LIMITER.bucket(endpoint)
+    slots = _slots(endpoint)
+    for attempt in range(retries + 1):
+        if attempt:
+            METRICS.retry(endpoint)
+        bucket.acquire()
+        t0 = time.perf_counter()
+        try:
+            if slots:
+                with slots:
+                    t0 = time.perf_counter()  # latency excludes the wait for a concurrency slot
+                    r = session.request(method, url, **kwargs)
+            else:
+                r = session.request(method, url, **kwargs)
+        except Exception as e:
+            METRICS.observe(endpoint, time.perf_counter() - t0, type(e).__name__)
+            if not isinstance(e, retry_exceptions) or attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            log.warning(f"[HTTP] {endpoint} {type(e).__name__} (try {attempt+1}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        METRICS.observe(endpoint, time.perf_counter() - t0, r.status_code, len(r.content or b""))
+
+        if r.status_code not in retry_on:
+            if r.status_code in RETRY_STATUSES:
+                bucket.penalize()  # throttled or failing, even when this call must not be retried
+            else:
+                bucket.reward()
+            return r
+        bucket.penalize()
+        if attempt >= retries:
+            return r
+        wait = retry_after(r)
+        if wait is not None:
+            bucket.pause(wait)
+        delay = wait if wait is not None else backoff_delay(attempt)
+        log.warning(f"[HTTP] {endpoint} HTTP {r.status_code} (try {attempt+1}); retrying in {delay:.1f}s")
+        time.sleep(delay)
+    return r
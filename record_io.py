@@ -0,0 +1,166 @@
+import os, csv, json, ast
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+def iter_name_chunks(input_csv: str, chunksize: int = 1000, column: str = "business_name") -> Iterator[List[str]]:
+    """Yield business names `chunksize` rows at a time (only one chunk is ever in memory)."""
+    import pandas as pd
+    for chunk in pd.read_csv(input_csv, usecols=[column], dtype={column: str}, chunksize=chunksize):
+        names = chunk[column].dropna().astype(str).tolist()
+        if names:
+            yield names
+
+def _cell(value: Optional[str]) -> Any:
+    """List cells were written as Python lists (see CSVResultWriter); read them back as lists."""
+    if value and value.startswith("[") and value.endswith("]"):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+    return value
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Rows of an earlier result file (.csv, .jsonl/.ndjson, .parquet), one at a time."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {k: _cell(v) for k, v in row.items()}
+
+class ResultWriter:
+    """
+    Append-only sink for result rows. CSV and JSONL flush every row, so a crash loses nothing written;
+    Parquet is durable per row group only and is unreadable until close() writes its footer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CSVResultWriter(ResultWriter):
+    """Same layout as the old DataFrame.to_csv output (list cells written as Python lists)."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w: Optional[csv.DictWriter] = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._w is None:
+            self._w = csv.DictWriter(self._f, fieldnames=list(row), extrasaction="ignore")
+            self._w.writeheader()
+        self._w.writerow({k: (str(v) if isinstance(v, (list, tuple)) else v) for k, v in row.items()})
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+class JSONLResultWriter(ResultWriter):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+# columns that hold lists of strings; every other column is written as a string
+LIST_COLUMNS = ("emails", "phones")
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Buffers `row_group_size` rows per Parquet row group (needs pyarrow). The schema is fixed from
+    the first row's columns, not inferred from data: list<string> for LIST_COLUMNS (and any list
+    value), string for everything else, so empty or null first rows cannot pin a column to `null`.
+    """
+
+    def __init__(self, path: str, row_group_size: int = 1000):
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        super().__init__(path)
+        self._pa, self._pq = pa, pq
+        self.row_group_size = row_group_size
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _schema(self, row: Dict[str, Any]):
+        pa = self._pa
+        return pa.schema([(k, pa.list_(pa.string()) if k in LIST_COLUMNS or isinstance(v, (list, tuple))
+                           else pa.string()) for k, v in row.items()])
+
+    @staticmethod
+    def _cell(value: Any, is_list: bool) -> Any:
+        if value is None:
+            return None
+        if is_list:
+            return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+        return str(value)
+
+    def _flush(self):
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self._schema(self._rows[0]))
+        schema = self._writer.schema
+        lists = {f.name: self._pa.types.is_list(f.type) for f in schema}
+        rows = [{k: self._cell(r.get(k), is_list) for k, is_list in lists.items()} for r in self._rows]
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=schema))
+        self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+class MultiWriter(ResultWriter):
+    def __init__(self, writers: Sequence[ResultWriter]):
+        self.writers = list(writers)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        for w in self.writers:
+            w.write(row)
+
+    def close(self) -> None:
+        for w in self.writers:
+            w.close()
+
+WRITERS = {"csv": CSVResultWriter, "jsonl": JSONLResultWriter, "parquet": ParquetResultWriter}
+
+def open_writer(path: str, fmt: Optional[str] = None) -> ResultWriter:
+    """Writer chosen by `fmt` or the file extension (.csv, .jsonl/.ndjson, .parquet)."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    fmt = (fmt or {"ndjson": "jsonl", "pq": "parquet"}.get(ext, ext) or "csv").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported output format: {fmt} (use one of {', '.join(WRITERS)})")
+    return WRITERS[fmt](path)
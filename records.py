@@ -0,0 +1,128 @@
+import os, json, gzip, hashlib
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, Any, List, Optional, Tuple
+
+# company payload keys read per profile field, first non-empty wins (Bright Data LinkedIn company dataset
+# names first, then common aliases)
+PROFILE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "website":      ("website", "company_website", "site", "official_website", "companyWebsite", "siteUrl"),
+    "company_name": ("name", "company_name", "companyName"),
+    "industry":     ("industries", "industry"),
+    "company_size": ("company_size", "size", "staff_count_range"),
+    "employees":    ("employees_in_linkedin", "staff_count", "employee_count"),
+    "headquarters": ("headquarters", "hq", "headquarter"),
+    "founded":      ("founded", "founded_year"),
+    "company_type": ("organization_type", "company_type", "type"),
+    "specialties":  ("specialties",),
+    "followers":    ("followers", "follower_count"),
+    "country":      ("country_code", "country"),
+}
+# wrappers some responses put the record in (the first element is used)
+CONTAINERS = ("results", "data", "items", "payload", "records")
+
+@dataclass(frozen=True, slots=True)
+class CompanyProfile:
+    """The few company payload fields the pipeline uses, as text ("" when unknown)."""
+    website: str = ""
+    company_name: str = ""
+    industry: str = ""
+    company_size: str = ""
+    employees: str = ""
+    headquarters: str = ""
+    founded: str = ""
+    company_type: str = ""
+    specialties: str = ""
+    followers: str = ""
+    country: str = ""
+    payload_path: str = ""  # raw payload spilled to disk, if requested
+
+    def columns(self) -> Dict[str, str]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+EMPTY_PROFILE = CompanyProfile()
+PROFILE_FIELDS = tuple(f.name for f in fields(CompanyProfile))
+
+def _text(value: Any) -> str:
+    if value is None or value == "" or value == [] or value == {}:
+        return ""
+    if isinstance(value, dict):  # e.g. {"city": ..., "country": ...}
+        return ", ".join(_text(v) for v in value.values() if _text(v))
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_text(v) for v in value if _text(v))
+    return str(value).strip()
+
+def _record(payload: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(payload, dict):
+        return None
+    if any(payload.get(k) for k in PROFILE_KEYS["website"]):
+        return payload
+    for container in CONTAINERS:
+        arr = payload.get(container)
+        if isinstance(arr, list) and arr and isinstance(arr[0], dict):
+            return arr[0]
+    return payload
+
+def spill_payload(payload: Any, spill_dir: str, key: str) -> str:
+    """gzip-compressed JSON copy of `payload` in `spill_dir`, named after `key`; returns its path."""
+    os.makedirs(spill_dir, exist_ok=True)
+    path = os.path.join(spill_dir, hashlib.sha1(key.encode()).hexdigest() + ".json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    return path
+
+def project_company(payload: Any, spill_dir: Optional[str] = None, key: str = "") -> CompanyProfile:
+    """
+    CompanyProfile from a (possibly wrapped) company payload, in one pass over the record's keys.
+    The caller can drop the payload afterwards; with `spill_dir` it is kept on disk first.
+    """
+    rec = _record(payload)
+    if not rec:
+        return EMPTY_PROFILE
+    found: Dict[str, str] = {}
+    for name, keys in PROFILE_KEYS.items():
+        for k in keys:
+            value = _text(rec.get(k))
+            if value:
+                found[name] = value
+                break
+    site = found.get("website", "")
+    if site and not site.startswith("http"):
+        found["website"] = "https://" + site.lstrip("/")
+    if spill_dir and key and not (isinstance(payload, dict) and payload.get("status") in ("error", "pending")):
+        found["payload_path"] = spill_payload(payload, spill_dir, key)
+    return CompanyProfile(**found) if found else EMPTY_PROFILE
+
+@dataclass(slots=True)
+class EnrichmentRow:
+    """One output row; the company profile is shared between rows that reuse a result."""
+    business_name: str
+    linkedin_company_url: str = ""
+    website: str = ""
+    emails: List[str] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    status: str = ""
+    profile: CompanyProfile = EMPTY_PROFILE
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat output row: the original six columns, then the profile columns."""
+        row = {"business_name": self.business_name, "linkedin_company_url": self.linkedin_company_url,
+               "website": self.website, "emails": list(self.emails), "phones": list(self.phones),
+               "status": self.status}
+        for name, value in self.profile.columns().items():
+            row.setdefault(name, value)  # "website" stays the row's own (possibly SERP-found) site
+        return row
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "EnrichmentRow":
+        """Back from a flat row (e.g. a ResultStore entry written before the profile columns existed)."""
+        profile = {name: str(row.get(name) or "") for name in PROFILE_FIELDS if name != "website"}
+        return cls(business_name=str(row.get("business_name") or ""),
+                   linkedin_company_url=str(row.get("linkedin_company_url") or ""),
+                   website=str(row.get("website") or ""),
+                   emails=list(row.get("emails") or []), phones=list(row.get("phones") or []),
+                   status=str(row.get("status") or ""),
+                   profile=CompanyProfile(**profile) if any(profile.values()) else EMPTY_PROFILE)
+
+    def renamed(self, business_name: str) -> "EnrichmentRow":
+        """Same result under another input name (duplicates, reused results)."""
+        return replace(self, business_name=business_name)
@@ -0,0 +1,72 @@
+import os, json, time, sqlite3, threading
+from typing import Dict, Any, Optional, List
+
+# columns the delta report never compares: the row's identity and where its raw payload was spilled
+UNDIFFED = ("business_name", "payload_path", "updated_at")
+# statuses that are worth another (paid) attempt on the next incremental run
+RETRY_STATUSES = ("no_website_found", "error")
+
+class ResultStore:
+    """
+    Last enrichment result per canonical company name, for incremental runs.
+    One SQLite row per company: the output fields + updated_at (epoch seconds).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.getenv("RESULT_STORE_PATH", os.path.join(".cache", "results.sqlite"))
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, row TEXT, status TEXT, updated_at REAL)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored row (with `updated_at`) or None."""
+        with self._lock:
+            hit = self._db.execute("SELECT row, updated_at FROM results WHERE key = ?", (key,)).fetchone()
+        if not hit:
+            return None
+        row = json.loads(hit[0])
+        row["updated_at"] = hit[1]
+        return row
+
+    def put(self, key: str, row: Dict[str, Any]) -> None:
+        data = {k: row.get(k) for k in row if k != "updated_at"}
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO results (key, row, status, updated_at) VALUES (?, ?, ?, ?)",
+                             (key, json.dumps(data, ensure_ascii=False), str(row.get("status", "")), time.time()))
+            self._db.commit()
+
+    @staticmethod
+    def is_fresh(stored: Optional[Dict[str, Any]], max_age_secs: float) -> bool:
+        """True when `stored` can be reused: recent enough and not a retry-worthy status."""
+        if not stored:
+            return False
+        status = str(stored.get("status", ""))
+        if status.startswith(RETRY_STATUSES):
+            return False
+        return time.time() - float(stored.get("updated_at", 0)) <= max_age_secs
+
+    @staticmethod
+    def diff(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Delta-report lines: one per changed field (or a single 'new' line for unseen companies).
+        Fields `old` does not have (rows stored before a column existed) are not reported as changed.
+        """
+        name = new.get("business_name", "")
+        if not old:
+            return [{"business_name": name, "change": "new", "field": "", "old": "", "new": new.get("status", "")}]
+        lines = []
+        for f in new:
+            if f in UNDIFFED or f not in old:
+                continue
+            before, after = old.get(f), new.get(f)
+            if isinstance(before, list) or isinstance(after, list):
+                before, after = sorted(before or []), sorted(after or [])
+            if (before or "") != (after or ""):
+                lines.append({"business_name": name, "change": "changed", "field": f,
+                              "old": json.dumps(before, ensure_ascii=False) if isinstance(before, list) else (before or ""),
+                              "new": json.dumps(after, ensure_ascii=False) if isinstance(after, list) else (after or "")})
+        return lines
@@ -0,0 +1,37 @@
+import pytest
+from names import canonical_name, canonicalize_series
+
+NAMES = [
+    "ACME Fitness, Inc.",
+    "acme fitness ",
+    "Acme   Fitness LLC",
+    "Café Müller GmbH",
+    "Johnson & Johnson",
+    "Smith and Co.",
+    "Foo S.A.",
+    "A.B.C. Holdings Ltd",
+    "Inc",
+    "Company",
+    "LLC Inc",
+    "",
+    None,
+    "  ",
+    "Ünïcödé & Sons Pty Ltd",
+    "Rock & Roll Co. and Co",
+]
+
+def test_canonical_name_examples():
+    assert canonical_name("ACME Fitness, Inc.") == "acme fitness"
+    assert canonical_name("Café Müller GmbH") == "cafe muller"
+    assert canonical_name("Foo S.A.") == "foo"
+    assert canonical_name("Inc") == "inc"  # a legal form alone is kept
+    assert canonical_name(None) == ""
+
+@pytest.mark.parametrize("name", NAMES)
+def test_series_matches_scalar(name):
+    pytest.importorskip("pandas")
+    assert canonicalize_series([name]).tolist() == [canonical_name(name)]
+
+def test_series_keeps_order_and_length():
+    pytest.importorskip("pandas")
+    assert canonicalize_series(NAMES).tolist() == [canonical_name(n) for n in NAMES]
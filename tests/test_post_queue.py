@@ -0,0 +1,83 @@
+import pytest
+from post_queue import PostQueue
+from use.post_scheduler import PostScheduler, DAY
+
+@pytest.fixture
+def queue(tmp_path):
+    return PostQueue(str(tmp_path / "posts.sqlite"))
+
+def status(queue, post_id):
+    return next(i["status"] for i in queue.items() if i["id"] == post_id)
+
+def test_add_dedups_on_whitespace_insensitive_text(queue):
+    first = queue.add("Shipping  v2\ntoday")
+    assert first is not None
+    assert queue.add(" Shipping v2 today ") is None
+    with pytest.raises(ValueError):
+        queue.add("   ")
+
+def test_next_due_respects_not_before(queue):
+    later = queue.add("later", not_before=2000.0)
+    sooner = queue.add("sooner", not_before=1000.0)
+    assert queue.next_due(now=500.0) is None
+    assert queue.next_due(now=1500.0)["id"] == sooner
+    assert queue.next_due(now=2500.0)["id"] == sooner  # oldest not_before first
+    assert queue.next_not_before() == 1000.0
+    queue.mark_posted(sooner, "urn:li:share:1")
+    assert queue.next_due(now=2500.0)["id"] == later
+
+def test_crash_mid_request_is_recovered_as_unknown(queue):
+    pid = queue.add("hello")
+    queue.mark_sending(pid, 1)
+    assert status(queue, pid) == "posting"
+    assert queue.next_due(now=1e12) is None  # a post being sent is never picked twice
+    assert queue.recover() == 1
+    assert status(queue, pid) == "unknown"
+    assert queue.next_due(now=1e12)["id"] == pid
+    assert queue.recover() == 0
+
+def test_requeue_and_cancel_only_from_allowed_states(queue):
+    pid = queue.add("hello")
+    assert not queue.requeue(pid)  # already queued
+    queue.mark_review(pid, "check LinkedIn")
+    assert queue.requeue(pid)
+    assert status(queue, pid) == "queued"
+    assert queue.cancel(pid)
+    assert status(queue, pid) == "cancelled"
+    assert not queue.cancel(pid)
+    queue.mark_posted(pid, "urn:li:share:1")
+    assert not queue.requeue(pid) and not queue.cancel(pid)
+    assert queue.counts() == {"posted": 1}
+
+def test_reschedule_and_failure(queue):
+    pid = queue.add("hello")
+    queue.mark_sending(pid, 1)
+    queue.reschedule(pid, 5000.0, "429")
+    item = queue.next_due(now=5000.0)
+    assert item["status"] == "queued" and item["attempts"] == 1 and item["error"] == "429"
+    queue.mark_failed(pid, "400")
+    assert queue.next_due(now=1e12) is None
+    assert status(queue, pid) == "failed"
+
+def scheduler(queue, posted_at, min_gap=3600.0, cap=3):
+    for i, t in enumerate(posted_at):
+        pid = queue.add(f"post {i}")
+        queue.mark_posted(pid, None)
+        queue._db.execute("UPDATE posts SET posted_at = ? WHERE id = ?", (t, pid))
+    queue._db.commit()
+    return PostScheduler(queue, li=None, min_gap_secs=min_gap, daily_cap=cap)
+
+def test_next_slot_without_history_is_now(queue):
+    assert scheduler(queue, []).next_slot(now=10_000.0) == 10_000.0
+
+def test_next_slot_enforces_min_gap(queue):
+    now = 10 * DAY
+    sched = scheduler(queue, [now - 600.0])
+    assert sched.next_slot(now=now) == now - 600.0 + 3600.0
+
+def test_next_slot_enforces_rolling_daily_cap(queue):
+    now = 10 * DAY
+    posted = [now - 20 * 3600.0, now - 10 * 3600.0, now - 5 * 3600.0]
+    sched = scheduler(queue, posted, min_gap=60.0, cap=3)
+    assert sched.next_slot(now=now) == posted[0] + DAY  # the oldest of the last 3 leaves the window
+    assert scheduler(queue, [], min_gap=60.0, cap=4).next_slot(now=now) == now
@@ -0,0 +1,85 @@
+import time
+from email.utils import formatdate
+import pytest
+import ratelimit
+from ratelimit import TokenBucket, RateLimiter, retry_after
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+def test_retry_after_seconds_and_date():
+    assert retry_after(FakeResponse({"Retry-After": "7"})) == 7.0
+    assert retry_after(FakeResponse({"Retry-After": "-3"})) == 0.0
+    assert retry_after(FakeResponse({"Retry-After": formatdate(time.time() + 60, usegmt=True)})) == pytest.approx(60, abs=2)
+    assert retry_after(FakeResponse({"Retry-After": formatdate(time.time() - 60, usegmt=True)})) == 0.0
+
+def test_retry_after_missing_or_garbage():
+    assert retry_after(FakeResponse({})) is None
+    assert retry_after(FakeResponse({"Retry-After": "soon"})) is None
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; sleeping advances it instead of waiting."""
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda secs: now.__setitem__(0, now[0] + secs))
+    return now
+
+def test_bucket_allows_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock[0] == 1000.0
+    bucket.acquire()
+    assert clock[0] == pytest.approx(1000.5)
+
+def test_penalize_halves_rate_with_floor_and_reward_recovers(clock):
+    bucket = TokenBucket(rate=10.0, burst=1.0)
+    bucket.penalize()
+    assert bucket.rate == 5.0
+    for _ in range(10):
+        bucket.penalize()
+    assert bucket.rate == pytest.approx(0.5)  # 5% of the budget
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.rate == 10.0
+
+def test_pause_blocks_until_deadline(clock):
+    bucket = TokenBucket(rate=100.0, burst=5.0)
+    bucket.pause(30.0)
+    bucket.acquire()
+    assert clock[0] == pytest.approx(1030.0)
+
+def test_budgets_from_env(monkeypatch):
+    monkeypatch.setenv("BD_RATE_SERP", "5:12")
+    monkeypatch.setenv("BD_RATE_TRIGGER", "0.5")
+    limiter = RateLimiter.from_env()
+    assert (limiter.bucket("serp").max_rate, limiter.bucket("serp").burst) == (5.0, 12.0)
+    assert (limiter.bucket("trigger").max_rate, limiter.bucket("trigger").burst) == (0.5, 1.0)
+    assert limiter.bucket("unknown") is limiter.bucket("unknown")
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        resp = FakeResponse({})
+        resp.status_code, resp.content = self.statuses.pop(0), b""
+        return resp
+
+def test_request_retries_5xx_in_retry_on(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda secs: None)
+    session = FakeSession([503, 502, 200])
+    assert ratelimit.request("POST", "http://x", "test-retry", session=session).status_code == 200
+    assert session.calls == 3
+
+def test_request_penalizes_5xx_it_does_not_retry(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda secs: None)
+    session = FakeSession([503])
+    r = ratelimit.request("POST", "http://x", "test-no-retry", session=session, retry_on=(429,))
+    assert r.status_code == 503 and session.calls == 1
+    bucket = ratelimit.LIMITER.bucket("test-no-retry")
+    assert bucket.rate == bucket.max_rate / 2
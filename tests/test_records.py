@@ -0,0 +1,54 @@
+import gzip, json
+from records import CompanyProfile, EMPTY_PROFILE, EnrichmentRow, PROFILE_FIELDS, project_company
+
+def test_project_company_reads_aliases_and_normalizes_website():
+    profile = project_company({
+        "company_website": "acme.com",
+        "companyName": "Acme",
+        "industries": ["Software", "", "Fitness"],
+        "headquarters": {"city": "Austin", "country": "US"},
+        "staff_count": 42,
+        "followers": None,
+    })
+    assert profile.website == "https://acme.com"
+    assert profile.company_name == "Acme"
+    assert profile.industry == "Software, Fitness"
+    assert profile.headquarters == "Austin, US"
+    assert profile.employees == "42"
+    assert profile.followers == ""
+
+def test_project_company_unwraps_containers():
+    assert project_company({"data": [{"website": "https://b.io"}]}).website == "https://b.io"
+    assert project_company({"results": []}) is EMPTY_PROFILE
+    assert project_company(None) is EMPTY_PROFILE
+    assert project_company([{"website": "x"}]) is EMPTY_PROFILE
+
+def test_project_company_spills_payload_but_not_errors(tmp_path):
+    payload = {"website": "https://acme.com", "extra": "x" * 100}
+    profile = project_company(payload, str(tmp_path), "https://www.linkedin.com/company/acme")
+    with gzip.open(profile.payload_path, "rt", encoding="utf-8") as f:
+        assert json.load(f) == payload
+    assert project_company({"status": "error"}, str(tmp_path), "k").payload_path == ""
+
+def test_to_dict_keeps_row_website_and_flattens_profile():
+    row = EnrichmentRow("Acme", "https://www.linkedin.com/company/acme", "https://serp-found.com",
+                        ["a@acme.com"], [], "ok", CompanyProfile(website="https://acme.com", industry="Software"))
+    data = row.to_dict()
+    assert list(data)[:6] == ["business_name", "linkedin_company_url", "website", "emails", "phones", "status"]
+    assert set(data) == set(list(data)[:6]) | set(PROFILE_FIELDS)
+    assert data["website"] == "https://serp-found.com"
+    assert data["industry"] == "Software"
+
+def test_from_dict_round_trip():
+    row = EnrichmentRow("Acme", "u", "https://acme.com", ["a@acme.com"], ["+1 555"], "ok",
+                        CompanyProfile(industry="Software", founded="1999"))
+    back = EnrichmentRow.from_dict(row.to_dict())
+    assert back == row
+    assert back.renamed("ACME Inc.").profile is back.profile
+
+def test_from_dict_accepts_rows_stored_before_profile_columns():
+    old = {"business_name": "Acme", "linkedin_company_url": None, "website": "https://acme.com",
+           "emails": None, "phones": ["+1 555"], "status": "ok", "updated_at": 1.0}
+    row = EnrichmentRow.from_dict(old)
+    assert row.profile is EMPTY_PROFILE
+    assert row.linkedin_company_url == "" and row.emails == [] and row.phones == ["+1 555"]
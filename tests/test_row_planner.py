@@ -0,0 +1,95 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import pytest
+from records import CompanyProfile
+from result_store import ResultStore
+from use.search_by_name import RowPlanner, enrich_chunks
+
+class FakeLI:
+    """Offline LinkedInClient stand-in: every name resolves, payloads arrive at once."""
+    def __init__(self):
+        self.resolved = []
+
+    def resolve_business(self, name):
+        self.resolved.append(name)
+        return f"https://www.linkedin.com/company/{name.lower().replace(' ', '-')}", None
+
+    def collect_company_payloads_async(self, urls):
+        fut = Future()
+        fut.set_result({u: {"website": u.replace("www.linkedin.com/company/", "") + ".com"} for u in urls})
+        return fut
+
+    def settle_payloads(self, payloads, *args, **kwargs):
+        return payloads
+
+    def finish_enrichment(self, name, li_url, profile, site_hint=None):
+        return {"business_name": name, "linkedin_company_url": li_url or "", "website": "",
+                "status": "ok", "profile": profile if isinstance(profile, CompanyProfile) else CompanyProfile()}
+
+class FakeWS:
+    def fetch_site_contacts(self, url):
+        return {"emails": [], "phones": []}
+
+def run(chunks, plan, batch_size=3):
+    li = FakeLI()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return li, list(enrich_chunks(li, FakeWS(), chunks, pool, batch_size, plan))
+
+def test_output_keeps_input_order_and_enriches_duplicates_once():
+    names = ["Acme Inc", "Bolt", "ACME", "Cog", "bolt llc", "Dyn", "Acme", "Eel"]
+    plan = RowPlanner(dedup=True)
+    li, rows = run([names[:5], names[5:]], plan)
+    assert [r["business_name"] for r in rows] == names
+    assert li.resolved == ["Acme Inc", "Bolt", "Cog", "Dyn", "Eel"]
+    assert rows[2]["linkedin_company_url"] == rows[0]["linkedin_company_url"]
+    assert plan.skipped == 3 and not plan.plans
+
+def chunks_read(names, size, log):
+    for i in range(0, len(names), size):
+        log.append(i)
+        yield names[i:i + size]
+
+def test_fresh_store_rows_stream_with_bounded_buffer(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    names = [f"Company {i}" for i in range(200)]
+    for n in names:
+        store.put(n.lower(), {"business_name": n, "website": "https://x.com", "status": "ok"})
+    plan = RowPlanner(dedup=True, store=store, max_buffered=20)
+    read, first_at, peak = [], [], [0]
+
+    def consume(pool):
+        for row in enrich_chunks(FakeLI(), FakeWS(), chunks_read(names, 10, read), pool, 50, plan):
+            peak[0] = max(peak[0], len(plan.plans))
+            first_at.append(len(read))
+            yield row
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        rows = list(consume(pool))
+    assert [r["business_name"] for r in rows] == names
+    assert first_at[0] < len(names) // 10  # rows were written before the input ran out
+    assert peak[0] <= 20
+    assert plan.reused == 200
+
+def test_repeated_name_streams_with_bounded_buffer():
+    names = ["Acme"] * 1000
+    plan = RowPlanner(dedup=True, max_buffered=50)
+    li = FakeLI()
+    peak = 0
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for row in enrich_chunks(li, FakeWS(), [names[i:i + 100] for i in range(0, 1000, 100)], pool, 50, plan):
+            peak = max(peak, len(plan.plans))
+            assert row["linkedin_company_url"].endswith("/acme")
+    assert li.resolved == ["Acme"]
+    assert peak <= 50 and plan.skipped == 999
+
+@pytest.mark.parametrize("max_buffered", [1, 4, 1000])
+def test_mixed_fresh_and_new_rows_keep_order(tmp_path, max_buffered):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    names = [f"Firm {i}" for i in range(40)]
+    for n in names[::3]:
+        store.put(n.lower(), {"business_name": n, "website": "https://stored.com", "status": "ok"})
+    plan = RowPlanner(dedup=True, store=store, max_buffered=max_buffered)
+    li, rows = run([names[i:i + 7] for i in range(0, 40, 7)], plan, batch_size=4)
+    assert [r["business_name"] for r in rows] == names
+    assert [r["website"] == "https://stored.com" for r in rows] == [i % 3 == 0 for i in range(40)]
+    assert len(li.resolved) == 40 - len(names[::3])
+    assert not plan.plans
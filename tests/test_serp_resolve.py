@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from cache import NullCache, SerpCache
+from clients.linkedin_client import LinkedInClient, SerpError
+
+class FakeSerpClient(LinkedInClient):
+    """LinkedInClient whose SERP answers come from a dict of query → organic results."""
+    def __init__(self, answers, serp_mode="merged"):
+        super().__init__(access_token="t", serp_cache=SerpCache(NullCache(), NullCache()), serp_mode=serp_mode)
+        self.answers = answers
+        self.queries = []
+
+    def _serp_organic(self, query):
+        self.queries.append(query)
+        answer = self.answers.get(query, [])
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+def test_merged_query_finds_linkedin_and_site_at_once():
+    li = FakeSerpClient({"Acme Fitness": [{"link": "https://acmefitness.com/"},
+                                          {"link": "https://www.linkedin.com/company/acme-fitness?trk=x"}]})
+    assert li.resolve_business("Acme Fitness") == ("https://www.linkedin.com/company/acme-fitness",
+                                                   "https://acmefitness.com/")
+    assert li.queries == ["Acme Fitness"]
+
+def test_merged_falls_back_to_site_query_without_linkedin_result():
+    li = FakeSerpClient({
+        "Acme Fitness": [{"link": "https://acmefitness.com/"}],
+        "site:linkedin.com/company Acme Fitness": [{"link": "https://www.linkedin.com/company/acme-fitness"}],
+    })
+    assert li.resolve_business("Acme Fitness") == ("https://www.linkedin.com/company/acme-fitness",
+                                                   "https://acmefitness.com/")
+    assert li.queries == ["Acme Fitness", "site:linkedin.com/company Acme Fitness"]
+
+def test_failed_serp_raises_instead_of_no_linkedin():
+    li = FakeSerpClient({"Acme": SerpError("HTTP 503")})
+    with pytest.raises(SerpError):
+        li.resolve_business("Acme")
+
+class FallbackClient(LinkedInClient):
+    """Per-URL collection that takes `delays[url]` seconds (or raises for "boom")."""
+    def __init__(self, delays):
+        super().__init__(access_token="t", serp_cache=SerpCache(NullCache(), NullCache()))
+        self.delays = delays
+
+    def _collect_linkedin_company(self, url):
+        if url == "boom":
+            raise RuntimeError("scrape failed")
+        time.sleep(self.delays.get(url, 0))
+        return {"website": f"https://{url}.com"}
+
+def test_settle_payloads_runs_fallbacks_in_pool_within_timeout():
+    payloads = {"ok": {"website": "https://ok.com"}, "a": {"batch_failed": True}, "b": {"batch_failed": True},
+                "slow": {"batch_failed": True}, "boom": {"batch_failed": True}}
+    li = FallbackClient({"a": 0.1, "b": 0.1, "slow": 1.5})
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        out = li.settle_payloads(payloads, pool, timeout=0.5)
+        assert time.monotonic() - t0 < 1.0  # a and b ran side by side, slow was not waited for
+        assert out["ok"] == {"website": "https://ok.com"}
+        assert out["a"] == {"website": "https://a.com"} and out["b"] == {"website": "https://b.com"}
+        assert out["slow"]["status"] == "pending"
+        assert out["boom"]["status"] == "error"
@@ -0,0 +1,39 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from clients.transport import FetchResult, RequestsTransport
+
+class LowercaseHeaders(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("content-type", "text/html")
+        self.send_header("etag", '"v1"')
+        self.send_header("last-modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(b"<html><body>hi</body></html>")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    srv = HTTPServer(("127.0.0.1", 0), LowercaseHeaders)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}/"
+    srv.shutdown()
+
+def test_fetch_result_headers_are_case_insensitive():
+    res = FetchResult(200, headers={"etag": '"v1"', "last-modified": "x"})
+    assert res.headers.get("ETag") == '"v1"'
+    assert res.headers["Last-Modified"] == "x"
+    assert FetchResult(304).headers.get("ETag") is None
+
+def test_requests_transport_keeps_validators(server):
+    transport = RequestsTransport()
+    try:
+        res = transport.get(server)
+    finally:
+        transport.close()
+    assert res.content.startswith(b"<html>")
+    assert res.headers.get("ETag") == '"v1"'
+    assert res.headers.get("Last-Modified") == "Mon, 01 Jan 2024 00:00:00 GMT"
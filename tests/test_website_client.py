@@ -0,0 +1,40 @@
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from clients.transport import FetchResult, Transport
+from clients.website_client import HostHealth, WebsiteClient
+from utils import LIMITS
+
+HOME = b'<html><body><a href="/contact">Contact</a><a href="/about">About</a><a href="/impressum">Impressum</a></body></html>'
+
+class SlowTransport(Transport):
+    """Every page takes `delay` seconds; records how many contact pages were in flight at once."""
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+
+    def get(self, url, headers=None, timeout=(5.0, 15.0)):
+        if url.endswith(".com"):
+            return FetchResult(200, HOME, "utf-8", {"Content-Type": "text/html"})
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return FetchResult(200, b"<html><body>nothing here</body></html>", "utf-8", {"Content-Type": "text/html"})
+
+def test_contact_pages_of_concurrent_sites_are_not_capped_by_one_sites_parallelism(monkeypatch):
+    monkeypatch.setenv("PAGE_STORE", "0")
+    default = LIMITS.crawl_slots
+    LIMITS.configure(crawl=16)
+    transport = SlowTransport()
+    ws = WebsiteClient(parallel=3, health=HostHealth(check_dns=False), parse_workers=0, transport=transport)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as workers:
+            list(workers.map(ws.fetch_site_contacts, [f"https://site{i}.com" for i in range(4)]))
+    finally:
+        ws.close()
+        LIMITS.configure(crawl=default)
+    assert transport.peak > 3
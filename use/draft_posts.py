@@ -0,0 +1,76 @@
+"""
+Batch drafting: one personalized LinkedIn post per enriched lead (the output of use.search_by_name).
+Drafts come back from Gemini `--workers` at a time under the "gemini" rate budget (BD_RATE_GEMINI),
+and prompts already drafted before are served from the prompt cache (.cache/gemini.sqlite).
+
+    python -m use.draft_posts --input output.jsonl --output drafts.csv \
+        --subject "How {business_name} can win more local customers" --workers 4
+
+Nothing is posted: review the drafts, then publish with use.post_linkedin.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+from itertools import islice
+from typing import Dict, Any, Iterator, List
+from clients.gemini_client import GeminiClient
+from metrics import METRICS
+from record_io import iter_records, open_writer
+from use.post_linkedin import build_linkedin_prompt
+
+class _Fields(dict):
+    def __missing__(self, key):  # unknown {placeholders} in --subject become empty
+        return ""
+
+def lead_prompt(row: Dict[str, Any], subject: str, tone: str = "professional, concise, engaging",
+                max_chars: int = 700) -> str:
+    """Prompt for one lead: `subject` is a str.format template over the lead's columns."""
+    return build_linkedin_prompt(subject=subject.format_map(_Fields(row)),
+                                 company_name=row.get("business_name"),
+                                 link=row.get("website") or row.get("linkedin_company_url") or None,
+                                 tone=tone, max_chars=max_chars)
+
+def _leads(path: str) -> Iterator[Dict[str, Any]]:
+    for row in iter_records(path):
+        if row.get("business_name") and not str(row.get("status") or "").startswith("error"):
+            yield row
+
+def run(input_path: str, output_path: str, subject: str, workers: int = 4, chunk: int = 200,
+        tone: str = "professional, concise, engaging", max_chars: int = 700):
+    gem = GeminiClient()
+    leads = _leads(input_path)
+    n = failed = cached = 0
+    with open_writer(output_path) as out:
+        while True:
+            rows: List[Dict[str, Any]] = list(islice(leads, chunk))
+            if not rows:
+                break
+            prompts = [lead_prompt(r, subject, tone, max_chars) for r in rows]
+            for row, gen in zip(rows, gem.generate_many(prompts, workers=workers)):
+                out.write({
+                    "business_name": row.get("business_name", ""),
+                    "website": row.get("website", ""),
+                    "linkedin_company_url": row.get("linkedin_company_url", ""),
+                    "draft": gen["text"],
+                    "model": gen["model"],
+                    "cached": gen["cached"],
+                    "error": gen.get("error", ""),
+                })
+                n += 1
+                failed += bool(gen.get("error"))
+                cached += bool(gen["cached"])
+            print(f"[DRAFT] {n} drafts written ({cached} from cache, {failed} failed)")
+    print(f"\nSaved {n} drafts to {output_path}")
+    print("\n" + METRICS.format_table())
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Draft one LinkedIn post per enriched lead (no posting)")
+    p.add_argument("--input", required=True, help="enrichment output (.csv, .jsonl or .parquet)")
+    p.add_argument("--output", default="drafts.csv", help=".csv, .jsonl or .parquet")
+    p.add_argument("--subject", required=True, help='template over lead columns, e.g. "Why {business_name} ..."')
+    p.add_argument("--tone", default="professional, concise, engaging")
+    p.add_argument("--max-chars", type=int, default=700)
+    p.add_argument("--workers", type=int, default=4, help="Gemini requests in flight")
+    args = p.parse_args()
+    run(args.input, args.output, args.subject, workers=args.workers, tone=args.tone, max_chars=args.max_chars)
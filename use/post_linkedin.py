@@ -27,7 +27,7 @@ Write 1 LinkedIn post draft in plain text.
 - No markdown or code fences.
 """
 
-def run(subject: str, name: str = None, link: str = None, auto: bool = False):
+def run(subject: str, name: str = None, link: str = None, auto: bool = False, queue: bool = False):
     # 1) Draft with Gemini
     gem = GeminiClient()
     prompt = build_linkedin_prompt(subject=subject, company_name=name, link=link)
@@ -44,7 +44,12 @@ def run(subject: str, name: str = None, link: str = None, auto: bool = False):
             print("Cancelled.")
             return
 
-    # 3) Post to LinkedIn
+    # 3) Post to LinkedIn (or leave it to use.post_scheduler)
+    if queue:
+        from post_queue import PostQueue
+        post_id = PostQueue().add(draft)
+        print(f"Queued as #{post_id}." if post_id else "Already queued.")
+        return
     li = LinkedInClient()
     print("Author URN:", li.get_member_urn())
     res = li.create_text_post(draft)
@@ -56,5 +61,6 @@ if __name__ == "__main__":
     p.add_argument("--name")
     p.add_argument("--link")
     p.add_argument("--auto", action="store_true")
+    p.add_argument("--queue", action="store_true", help="queue the draft for use.post_scheduler instead of posting now")
     args = p.parse_args()
-    run(subject=args.subject, name=args.name, link=args.link, auto=args.auto)
+    run(subject=args.subject, name=args.name, link=args.link, auto=args.auto, queue=args.queue)
@@ -0,0 +1,195 @@
+"""
+Queued LinkedIn posting: drafts go into a durable SQLite queue (POST_QUEUE_PATH, default
+.cache/posts.sqlite) and one long-running worker publishes them, spaced out and capped per day.
+
+    python -m use.post_scheduler add --drafts drafts.csv            # column "draft" (use.draft_posts output)
+    python -m use.post_scheduler add --text "Shipping v2 today"
+    python -m use.post_scheduler run --min-gap-mins 90 --daily-cap 8
+    python -m use.post_scheduler status
+    python -m use.post_scheduler requeue 42 | cancel 42
+    python -m use.post_scheduler recover                            # after a crashed `run --once`
+
+Retries never double-post: a post whose request may have reached LinkedIn (timeout, 5xx,
+crash) is matched against the member's recent posts before it is sent again; if those cannot
+be read, the post is parked in `review` instead of being re-sent.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import os, time, signal, argparse, threading
+from typing import Dict, Any, Optional
+from clients.linkedin_client import LinkedInClient, PostError
+from post_queue import PostQueue, text_key
+from ratelimit import backoff_delay
+from record_io import iter_records
+from utils import log
+
+MIN_GAP_SECS = float(os.getenv("POST_MIN_GAP_MINS", "60")) * 60
+DAILY_CAP = int(os.getenv("POST_DAILY_CAP", "10"))
+MAX_ATTEMPTS = 5
+DAY = 86400.0
+
+class PostScheduler:
+    """Publishes due posts one at a time, at least `min_gap_secs` apart and at most `daily_cap` per 24h."""
+
+    def __init__(self, queue: PostQueue, li: LinkedInClient, min_gap_secs: float = MIN_GAP_SECS,
+                 daily_cap: int = DAILY_CAP, max_attempts: int = MAX_ATTEMPTS):
+        self.queue = queue
+        self.li = li
+        self.min_gap_secs = min_gap_secs
+        self.daily_cap = daily_cap
+        self.max_attempts = max_attempts
+
+    def next_slot(self, now: Optional[float] = None) -> float:
+        """Earliest time the spacing and the rolling 24h cap allow another post."""
+        now = now or time.time()
+        slot = now
+        last = self.queue.last_posted_at()
+        if last:
+            slot = max(slot, last + self.min_gap_secs)
+        recent = self.queue.posted_since(now - DAY)
+        if self.daily_cap and len(recent) >= self.daily_cap:
+            slot = max(slot, recent[-self.daily_cap] + DAY)
+        return slot
+
+    def _already_posted(self, item: Dict[str, Any]) -> Optional[str]:
+        """LinkedIn id of a recent post with this text published since it was queued, else None (may raise)."""
+        since = item["created_at"] - 300
+        for post in self.li.recent_posts():
+            if post["created"] >= since and text_key(post["text"]) == item["text_key"]:
+                return post["id"] or ""
+        return None
+
+    def deliver(self, item: Dict[str, Any]):
+        """One attempt at `item`; every outcome is recorded in the queue."""
+        pid, attempt = item["id"], item["attempts"] + 1
+        if item["status"] == "unknown":
+            try:
+                found = self._already_posted(item)
+            except Exception as e:
+                self.queue.mark_review(pid, f"outcome of the last attempt unknown and recent posts unavailable ({e}); "
+                                            "check LinkedIn, then requeue or cancel")
+                log.warning(f"[POST] #{pid} parked for review: {e}")
+                return
+            if found is not None:
+                self.queue.mark_posted(pid, found, "found among recent posts after an unknown outcome")
+                log.info(f"[POST] #{pid} was already published ({found})")
+                return
+        if attempt > self.max_attempts:
+            self.queue.mark_failed(pid, item.get("error") or "too many attempts")
+            return
+
+        import requests
+        self.queue.mark_sending(pid, attempt)
+        retry_at = time.time() + max(60.0, backoff_delay(attempt, base=60.0, cap=3600.0))
+        try:
+            res = self.li.create_text_post(item["text"], visibility=item["visibility"] or "PUBLIC")
+        except PostError as e:
+            if e.status == 429:
+                self.queue.reschedule(pid, retry_at, str(e))
+            elif e.status >= 500:
+                self.queue.mark_unknown(pid, retry_at, str(e))
+            elif e.status == 422 and "duplicate" in str(e.detail).lower():
+                self.queue.mark_posted(pid, None, "LinkedIn reports the post as a duplicate")
+            else:
+                self.queue.mark_failed(pid, str(e))
+            log.warning(f"[POST] #{pid} attempt {attempt}: {e}")
+            return
+        except requests.exceptions.ConnectTimeout as e:  # never reached LinkedIn
+            self.queue.reschedule(pid, retry_at, f"{type(e).__name__}: {e}")
+            log.warning(f"[POST] #{pid} attempt {attempt}: {e}")
+            return
+        except requests.exceptions.RequestException as e:  # may have been received
+            self.queue.mark_unknown(pid, retry_at, f"{type(e).__name__}: {e}")
+            log.warning(f"[POST] #{pid} attempt {attempt}, outcome unknown: {e}")
+            return
+        self.queue.mark_posted(pid, res.get("id"))
+        log.info(f"[POST] #{pid} published ({res.get('id') or 'no id returned'})")
+
+    def run_once(self, now: Optional[float] = None) -> bool:
+        """Deliver one due post if pacing allows; True when an attempt was made."""
+        now = now or time.time()
+        if self.next_slot(now) > now:
+            return False
+        item = self.queue.next_due(now)
+        if not item:
+            return False
+        self.deliver(item)
+        return True
+
+    def run(self, stop: threading.Event, poll_secs: float = 30.0):
+        recovered = self.queue.recover()
+        if recovered:
+            log.warning(f"[POST] {recovered} post(s) interrupted mid-request; checking them before any retry")
+        print("Posting as", self.li.get_member_urn())
+        while not stop.is_set():
+            if self.run_once():
+                continue
+            now = time.time()
+            due = self.queue.next_not_before()
+            wake = max(self.next_slot(now), due) if due is not None else now + poll_secs
+            stop.wait(min(max(1.0, wake - now), poll_secs))  # new posts may be added meanwhile
+
+def _terminate(*_):
+    raise KeyboardInterrupt
+
+def add(queue: PostQueue, text: Optional[str] = None, drafts: Optional[str] = None, column: str = "draft",
+        start_at: Optional[float] = None) -> int:
+    texts = [text] if text else [str(r.get(column) or "") for r in iter_records(drafts)]
+    added = 0
+    for t in texts:
+        if t.strip() and queue.add(t, not_before=start_at):
+            added += 1
+    print(f"Queued {added} post(s) ({len(texts) - added} empty or already queued)")
+    return added
+
+def status(queue: PostQueue, show: Optional[str] = None):
+    print(", ".join(f"{k}: {v}" for k, v in sorted(queue.counts().items())) or "queue is empty")
+    for item in queue.items(show) if show else []:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(item["posted_at"] or item["not_before"]))
+        preview = " ".join(item["text"].split())[:60]
+        print(f"#{item['id']:<5} {item['status']:<9} {when}  {preview}" + (f"  [{item['error']}]" if item["error"] else ""))
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Durable LinkedIn post queue + scheduler")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("add", help="queue posts")
+    src = a.add_mutually_exclusive_group(required=True)
+    src.add_argument("--text")
+    src.add_argument("--drafts", help="drafts file (.csv, .jsonl or .parquet), e.g. from use.draft_posts")
+    a.add_argument("--column", default="draft")
+    a.add_argument("--start-in-mins", type=float, default=0, help="do not post before now + this")
+    r = sub.add_parser("run", help="publish queued posts until stopped")
+    r.add_argument("--min-gap-mins", type=float, default=MIN_GAP_SECS / 60, help="minutes between posts (POST_MIN_GAP_MINS)")
+    r.add_argument("--daily-cap", type=int, default=DAILY_CAP, help="posts per rolling 24h (POST_DAILY_CAP)")
+    r.add_argument("--once", action="store_true", help="deliver at most one due post, then exit")
+    s = sub.add_parser("status", help="counts per status")
+    s.add_argument("--show", choices=("queued", "unknown", "review", "posted", "failed", "cancelled"))
+    for name in ("requeue", "cancel"):
+        sub.add_parser(name).add_argument("id", type=int)
+    sub.add_parser("recover", help="mark posts left in `posting` as unknown (only while no worker runs)")
+    args = p.parse_args()
+
+    queue = PostQueue()
+    if args.cmd == "add":
+        add(queue, args.text, args.drafts, args.column, time.time() + args.start_in_mins * 60)
+    elif args.cmd == "status":
+        status(queue, args.show)
+    elif args.cmd == "recover":
+        print(f"{queue.recover()} interrupted post(s) marked unknown")
+    elif args.cmd in ("requeue", "cancel"):
+        ok = queue.requeue(args.id) if args.cmd == "requeue" else queue.cancel(args.id)
+        print(f"#{args.id} {'requeued' if args.cmd == 'requeue' else 'cancelled'}" if ok
+              else f"#{args.id}: nothing to {args.cmd}")
+    else:
+        sched = PostScheduler(queue, LinkedInClient(), args.min_gap_mins * 60, args.daily_cap)
+        if args.once:  # no recover(): a `run` worker may be mid-request on a `posting` post
+            print("Posted one" if sched.run_once() else "Nothing due (or pacing limit reached)")
+        else:
+            signal.signal(signal.SIGTERM, _terminate)
+            stop = threading.Event()
+            try:
+                sched.run(stop)
+            except KeyboardInterrupt:
+                stop.set()
+            print("\nQueue: " + ", ".join(f"{k}: {v}" for k, v in sorted(queue.counts().items())))
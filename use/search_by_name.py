@@ -1,42 +1,322 @@
-import json
-import pandas as pd
+import os, json, time, argparse
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from collections import deque, OrderedDict
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Union, Tuple
+from record_io import iter_name_chunks, open_writer, MultiWriter, ResultWriter
+from result_store import ResultStore
+from records import EnrichmentRow, CompanyProfile, project_company
+from names import canonicalize_series
 from clients.linkedin_client import LinkedInClient
 from clients.website_client import WebsiteClient
+from metrics import METRICS
+from utils import LIMITS, log, require_brightdata
 
-def run_from_csv(input_csv="sample_names.csv", output_csv="output.csv"):
-    df = pd.read_csv(input_csv)
-    names = df["business_name"].dropna().astype(str).tolist()
+# longest wait for one batch's company payloads before its rows go out without a profile
+BATCH_WAIT_SECS = float(os.getenv("BD_BATCH_WAIT_SECS", "600"))
+# in a name or result stream: finish what is in flight and emit every row planned so far
+FLUSH = None
+# rows planned but not yet written before RowPlanner asks for a FLUSH
+MAX_BUFFERED = int(os.getenv("PLAN_MAX_BUFFERED", "5000"))
 
-    li = LinkedInClient()
-    ws = WebsiteClient()
+def _resolve(li: LinkedInClient, name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(LinkedIn URL, website hint, error): a failed lookup becomes an error row, not "no LinkedIn"."""
+    try:
+        return (*li.resolve_business(name), None)
+    except Exception as e:
+        log.error(f"[SERP] {name} failed: {e}")
+        return None, None, f"error: serp lookup failed ({e})"
 
-    results = []
-    for name in names:
-        print(f"\n {name}")
-        info = li.enrich_business(name)
+def enrich_row(li: LinkedInClient, ws: WebsiteClient, name: str, li_url: Optional[str],
+               payload: Union[Dict[str, Any], CompanyProfile], site_hint: Optional[str] = None,
+               error: Optional[str] = None) -> EnrichmentRow:
+    """Website + contacts for one business once its LinkedIn URL/payload (or profile) are known (never raises)."""
+    print(f"\n {name}")
+    if error:  # the lookup itself failed: retried on the next run instead of guessing a website
+        return EnrichmentRow(business_name=name, status=error)
+    try:
+        info = li.finish_enrichment(name, li_url, payload, site_hint)
         website = info.get("website", "")
 
         emails, phones = [], []
         if website:
-            print("Crawling website for contact info…")
-            contacts = ws.fetch_site_contacts(website)
+            print(f"Crawling website for contact info… ({website})")
+            with METRICS.timed("site"):
+                contacts = ws.fetch_site_contacts(website)
             emails = contacts["emails"]
             phones = contacts["phones"]
+    except Exception as e:
+        log.error(f"[ENRICH] {name} failed: {e}")
+        info, website, emails, phones = {"status": f"error: {e}"}, "", [], []
+
+    return EnrichmentRow(
+        business_name=name,
+        linkedin_company_url=info.get("linkedin_company_url", ""),
+        website=website,
+        emails=emails,
+        phones=phones,
+        status=info.get("status", ""),
+        profile=info.get("profile") or CompanyProfile(),
+    )
+
+def _batches(names: Iterable[Optional[str]], size: int) -> Iterator[List[str]]:
+    """Lists of up to `size` names; a FLUSH name sends the partial batch, then an empty one."""
+    batch: List[str] = []
+    for name in names:
+        if name is FLUSH:
+            if batch:
+                yield batch
+                batch = []
+            yield []
+            continue
+        batch.append(name)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def enrich_stream(li: LinkedInClient, ws: WebsiteClient, batches: Iterable[List[str]],
+                  pool: ThreadPoolExecutor, spill_dir: Optional[str] = None) -> Iterator[EnrichmentRow]:
+    """
+    Three stages per batch so dataset latency is paid once per batch:
+    SERP lookups (parallel) → one bulk dataset snapshot → website/contacts (parallel).
+    The next batch's SERP lookups run while the previous batch's snapshot is being built;
+    an empty batch finishes the one in flight at once and is passed on as FLUSH.
+    Rows are yielded in input order as soon as they are done. Each company payload is cut down to
+    its CompanyProfile as soon as the snapshot arrives (optionally spilled to `spill_dir` first),
+    so no raw payload is held while the batch's websites are crawled.
+    """
+    pending = None  # (names, [(li_url, site_hint, error)], Future[payloads]) of the batch awaiting its snapshot
+    for batch in batches:
+        if not batch:
+            if pending:
+                rows, pending = _finish_batch(li, ws, pending, pool, spill_dir), None
+                yield from rows
+            yield FLUSH
+            continue
+        resolved = list(pool.map(lambda n: _resolve(li, n), batch))
+        fut = li.collect_company_payloads_async(u for u, _, _ in resolved)
+        prev, pending = pending, (batch, resolved, fut)
+        if prev:
+            rows, prev = _finish_batch(li, ws, prev, pool, spill_dir), None  # drop the raw snapshot before crawling
+            yield from rows
+    if pending:
+        rows, pending = _finish_batch(li, ws, pending, pool, spill_dir), None
+        yield from rows
+
+def _finish_batch(li: LinkedInClient, ws: WebsiteClient, pending, pool: ThreadPoolExecutor,
+                  spill_dir: Optional[str] = None) -> Iterator[EnrichmentRow]:
+    batch, resolved, fut = pending
+    deadline = time.monotonic() + BATCH_WAIT_SECS  # covers the snapshot and any per-URL fallback
+    try:
+        with METRICS.timed("dataset_wait"):
+            payloads = li.settle_payloads(fut.result(timeout=BATCH_WAIT_SECS), pool,
+                                          timeout=max(0.0, deadline - time.monotonic()))
+        profiles = {url: project_company(payload, spill_dir, url) for url, payload in payloads.items()}
+    except FutureTimeout:
+        log.error(f"[BD] batch of {len(batch)} not collected after {BATCH_WAIT_SECS:.0f}s; writing rows without profiles")
+        profiles = {}
+    except Exception as e:
+        log.error(f"[BD] batch collection failed: {e}")
+        profiles = {}
+    # map() yields in input order, so the output is deterministic whatever the worker count
+    return pool.map(lambda n, r: enrich_row(li, ws, n, r[0], profiles.get(r[0], {}) if r[0] else {}, r[1], r[2]),
+                    batch, resolved)
+
+class RowPlanner:
+    """
+    Decides, per input row, whether it needs a fresh enrichment:
+    - near-duplicate names ("Acme Fitness", "ACME Fitness Inc.") share one enrichment (`dedup`)
+    - with a ResultStore (incremental mode), rows whose stored result is still fresh are reused
+    unique_names() yields only the names to enrich, rows() re-expands the results in input
+    order. The last `max_remembered` results are kept for duplicates that appear much later.
+    Once `max_buffered` rows are planned but not yet emitted (long runs of fresh or duplicate
+    rows), unique_names() yields FLUSH so the rows so far are written before reading on.
+    """
+
+    def __init__(self, dedup: bool = True, store: Optional[ResultStore] = None, max_age_days: float = 30,
+                 delta: Optional[ResultWriter] = None, max_remembered: int = 50_000,
+                 max_buffered: int = MAX_BUFFERED):
+        self.plans: deque = deque()  # (name, key, kind, stored row) per input row, oldest first
+        self.memo: "OrderedDict[str, Optional[EnrichmentRow]]" = OrderedDict()
+        self.dedup = dedup
+        self.store = store
+        self.max_age_secs = max_age_days * 86400
+        self.delta = delta
+        self.max_remembered = max_remembered
+        self.max_buffered = max(1, max_buffered)
+        self.skipped = 0
+        self.reused = 0
+        self.changed = 0
 
-        results.append({
-            "business_name": name,
-            "linkedin_company_url": info.get("linkedin_company_url", ""),
-            "website": website,
-            "emails": emails,
-            "phones": phones,
-            "status": info.get("status", "")
-        })
+    def unique_names(self, chunks: Iterable[List[str]]) -> Iterator[Optional[str]]:
+        for chunk in chunks:
+            keys = canonicalize_series(chunk).tolist()  # one vectorized pass per chunk
+            for name, key in zip(chunk, keys):
+                key = key or name
+                if self.dedup and key in self.memo:
+                    self.memo.move_to_end(key)
+                    self.plans.append((name, key, "copy", None))
+                else:
+                    stored = self.store.get(key) if self.store else None
+                    if ResultStore.is_fresh(stored, self.max_age_secs):
+                        row = EnrichmentRow.from_dict(stored)
+                        self.plans.append((name, key, "stored", row))
+                        if self.dedup:
+                            self._remember(key, row)
+                    else:
+                        if self.dedup:
+                            self.memo[key] = None
+                        self.plans.append((name, key, "enrich", None))
+                        yield name
+                if len(self.plans) >= self.max_buffered:
+                    yield FLUSH
+
+    def rows(self, results: Iterable[EnrichmentRow], fallback) -> Iterator[EnrichmentRow]:
+        for row in results:
+            yield from self._copies(fallback)
+            if row is FLUSH:
+                continue
+            _, key, _, _ = self.plans.popleft()
+            if self.dedup:
+                self._remember(key, row)
+            if self.store:
+                self._record(key, row)
+            yield row
+        yield from self._copies(fallback)
+
+    def _copies(self, fallback) -> Iterator[EnrichmentRow]:
+        while self.plans and self.plans[0][2] != "enrich":
+            name, key, kind, stored = self.plans.popleft()
+            if kind == "stored":
+                self.reused += 1
+                src = stored
+            else:
+                self.skipped += 1
+                src = self.memo.get(key)
+            yield src.renamed(name) if src else fallback(name)
+
+    def _remember(self, key: str, row: EnrichmentRow):
+        self.memo[key] = row
+        while len(self.memo) > self.max_remembered:
+            old_key, old = self.memo.popitem(last=False)
+            if old is None:  # still in flight: keep it
+                self.memo[old_key] = None
+                break
+
+    def _record(self, key: str, row: EnrichmentRow):
+        prev = self.store.get(key)
+        if prev and row.status.startswith("error"):
+            return  # keep the last good result; it is stale, so the next run retries
+        data = row.to_dict()
+        lines = ResultStore.diff(prev, data)
+        self.store.put(key, data)
+        if lines:
+            self.changed += 1
+        if self.delta:
+            for line in lines:
+                self.delta.write(line)
+
+def _enrich_one(li: LinkedInClient, ws: WebsiteClient, name: str, spill_dir: Optional[str] = None) -> EnrichmentRow:
+    li_url, site_hint, error = _resolve(li, name)
+    if error:
+        return enrich_row(li, ws, name, None, {}, error=error)
+    try:
+        profile = project_company(li.collect_company_payload(li_url), spill_dir, li_url) if li_url else {}
+    except Exception as e:
+        log.error(f"[BD] {name} failed: {e}")
+        profile = {}
+    return enrich_row(li, ws, name, li_url, profile, site_hint)
+
+def enrich_chunks(li: LinkedInClient, ws: WebsiteClient, chunks: Iterable[List[str]], pool: ThreadPoolExecutor,
+                  batch_size: int = 50, plan: Optional[RowPlanner] = None,
+                  spill_dir: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Name chunks → flat result rows in input order (shared by run_from_csv and the enrichment service).
+    spill_dir: keep each raw company payload there as .json.gz (default: PAYLOAD_SPILL_DIR env, unset = dropped).
+    """
+    spill_dir = spill_dir or os.getenv("PAYLOAD_SPILL_DIR") or None
+    names = plan.unique_names(chunks) if plan else (name for chunk in chunks for name in chunk)
+    rows = enrich_stream(li, ws, _batches(names, max(1, batch_size)), pool, spill_dir)
+    if plan:
+        rows = plan.rows(rows, lambda name: _enrich_one(li, ws, name, spill_dir))
+    return (row.to_dict() for row in rows)
+
+def run_from_csv(input_csv="sample_names.csv", output_csv: Union[str, List[str]] = "output.csv",
+                 workers: int = 1, batch_size: int = 50, chunksize: int = 1000,
+                 parse_workers: Optional[int] = None, dedup: bool = True, incremental: bool = False,
+                 max_age_days: float = 30, delta_report: Optional[str] = None,
+                 metrics_json: Optional[str] = "metrics.json", metrics_prom: Optional[str] = None,
+                 keep_payloads: Optional[str] = None):
+    """
+    Stream `input_csv` in chunks and append each finished row to every output
+    (.csv / .jsonl / .parquet), so memory stays flat and a crash keeps finished rows.
+    With `dedup`, rows whose canonical name was already seen reuse that result.
+    With `incremental`, results from earlier runs (ResultStore) are reused unless older than
+    `max_age_days` or last ended in no_website_found/error; `delta_report` lists what changed.
+    Per-stage call statistics go to `metrics_json` (and `metrics_prom`, Prometheus text format).
+    Rows carry the company profile columns (industry, size, HQ, …); raw Bright Data payloads are
+    dropped once projected unless `keep_payloads` names a directory to spill them to.
+    """
+    require_brightdata()  # fail once here, not as an error row per input name
+    outputs = [output_csv] if isinstance(output_csv, str) else list(output_csv)
+    li = LinkedInClient()
+    ws = WebsiteClient(parse_workers=parse_workers)
+    store = ResultStore() if incremental else None
+    delta = open_writer(delta_report) if delta_report and store else None
 
-    out = pd.DataFrame(results)
-    out.to_csv(output_csv, index=False)
-    print(f"\n Saved results to {output_csv}")
-    print(json.dumps(results, ensure_ascii=False, indent=2))
+    n = 0
+    chunks = iter_name_chunks(input_csv, chunksize)
+    plan = RowPlanner(dedup, store, max_age_days, delta) if dedup or store else None
+    try:
+        with MultiWriter([open_writer(p) for p in outputs]) as out, \
+                ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for row in enrich_chunks(li, ws, chunks, pool, batch_size, plan, keep_payloads):
+                out.write(row)
+                print(json.dumps(row, ensure_ascii=False))
+                n += 1
+    finally:
+        li.close()
+        ws.close()
+        if delta:
+            delta.close()
+    if plan and plan.skipped:
+        print(f"\n {plan.skipped} duplicate names reused an earlier result")
+    if plan and store:
+        print(f"\n {plan.reused} rows still fresh in the result store, {plan.changed} new or changed"
+              + (f" (see {delta_report})" if delta else ""))
+    print(f"\n Saved {n} results to {', '.join(outputs)}")
+    print("\n" + METRICS.format_table())
+    if metrics_json:
+        METRICS.write_json(metrics_json)
+    if metrics_prom:
+        METRICS.write_prometheus(metrics_prom)
 
 if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--input", default="sample_names.csv")
+    p.add_argument("--output", action="append", help="output file(s): .csv, .jsonl or .parquet (repeatable; default output.csv)")
+    p.add_argument("--chunksize", type=int, default=1000, help="input rows read per chunk")
+    p.add_argument("--workers", type=int, default=1, help="names enriched in parallel")
+    p.add_argument("--batch-size", type=int, default=50, help="company URLs per Bright Data dataset request")
+    p.add_argument("--serp-concurrency", type=int, help="max in-flight SERP requests")
+    p.add_argument("--dataset-concurrency", type=int, help="max in-flight dataset requests")
+    p.add_argument("--crawl-concurrency", type=int, help="max in-flight website fetches")
+    p.add_argument("--no-dedup", action="store_true", help="enrich every row, even near-duplicate names")
+    p.add_argument("--parse-workers", type=int, help="processes parsing HTML (0 = parse in the fetch threads)")
+    p.add_argument("--incremental", action="store_true", help="reuse fresh results from earlier runs (RESULT_STORE_PATH)")
+    p.add_argument("--max-age-days", type=float, default=30, help="with --incremental: re-enrich results older than this")
+    p.add_argument("--delta-report", help="with --incremental: write new/changed fields to this .csv/.jsonl")
+    p.add_argument("--metrics", default="metrics.json", help="per-stage timing/call/cost summary (JSON; '' to skip)")
+    p.add_argument("--prometheus", help="also write the metrics in Prometheus text format to this file")
+    p.add_argument("--keep-payloads", help="directory to keep raw company payloads in (.json.gz; PAYLOAD_SPILL_DIR)")
+    args = p.parse_args()
+    if args.delta_report and not args.incremental:
+        p.error("--delta-report needs --incremental")
+    LIMITS.configure(serp=args.serp_concurrency, dataset=args.dataset_concurrency, crawl=args.crawl_concurrency)
     print("search_by_name running…")
-    run_from_csv()
+    run_from_csv(args.input, args.output or ["output.csv"], workers=args.workers,
+                 batch_size=args.batch_size, chunksize=args.chunksize, parse_workers=args.parse_workers,
+                 dedup=not args.no_dedup, incremental=args.incremental, max_age_days=args.max_age_days,
+                 delta_report=args.delta_report, metrics_json=args.metrics or None, metrics_prom=args.prometheus,
+                 keep_payloads=args.keep_payloads)
@@ -0,0 +1,228 @@
+"""
+Long-running enrichment service: one process keeps the LinkedIn/website clients, the HTTP
+connection pools (utils.SESSION, the crawl transport), the SERP/page caches and the worker pools
+warm between jobs, instead of paying for cold TLS handshakes and empty caches on every run.
+
+Jobs come from either (or both):
+- HTTP (localhost only):
+    POST /enrich  {"names": ["Acme Fitness", ...]}  → NDJSON result rows, streamed as they complete
+    GET  /health                                   → status + run metrics
+- a spool directory: write <job>.jsonl (one {"business_name": ...} per line) to <spool>/incoming/
+  (write it elsewhere and rename it in, so half-written files are never picked up);
+  rows are appended to <spool>/done/<job>.results.jsonl as they complete.
+
+    python -m use.serve --port 8088 --spool spool --workers 8
+    curl -N -d '{"names": ["Acme Fitness", "Bolt Logistics"]}' http://127.0.0.1:8088/enrich
+"""
+import os, json, glob, signal, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from itertools import islice
+from typing import Dict, Any, List, Iterator, Optional
+from clients.linkedin_client import LinkedInClient
+from clients.website_client import WebsiteClient
+from metrics import METRICS
+from record_io import JSONLResultWriter
+from result_store import ResultStore
+from use.search_by_name import RowPlanner, enrich_chunks
+from utils import LIMITS, log, require_brightdata
+
+class EnrichmentService:
+    """Warm clients + pools shared by every job; at most `max_jobs` jobs run at once (others wait)."""
+
+    def __init__(self, workers: int = 8, batch_size: int = 50, parse_workers: Optional[int] = None,
+                 dedup: bool = True, incremental: bool = False, max_age_days: float = 30, max_jobs: int = 2):
+        require_brightdata()  # refuse to start rather than fail every job row by row
+        self.li = LinkedInClient()
+        self.ws = WebsiteClient(parse_workers=parse_workers)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="enrich")
+        self.batch_size = batch_size
+        self.dedup = dedup
+        self.store = ResultStore() if incremental else None
+        self.max_age_days = max_age_days
+        self._slots = threading.BoundedSemaphore(max(1, max_jobs))
+        self._lock = threading.Lock()
+        self.running = 0
+
+    def run_job(self, names: List[str], chunksize: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Result rows for `names`, in order, as they complete."""
+        with self._slots:
+            with self._lock:
+                self.running += 1
+            try:
+                plan = RowPlanner(self.dedup, self.store, self.max_age_days) if self.dedup or self.store else None
+                it = iter(names)
+                chunks = iter(lambda: list(islice(it, chunksize)), [])
+                yield from enrich_chunks(self.li, self.ws, chunks, self.pool, self.batch_size, plan)
+                METRICS.count("service", "jobs")
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.li.close()
+        self.ws.close()
+
+# ---------- spool directory ----------
+def _read_names(path: str) -> List[str]:
+    names = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            name = item if isinstance(item, str) else (item.get("business_name") or item.get("name"))
+            if name:
+                names.append(str(name))
+    return names
+
+def _oldest_first(paths: List[str]) -> List[str]:
+    """`paths` by mtime, skipping files another watcher claimed (or a client removed) meanwhile."""
+    stamped = []
+    for path in paths:
+        try:
+            stamped.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    return [path for _, path in sorted(stamped)]
+
+def watch_spool(service: EnrichmentService, root: str, stop: threading.Event, interval: float = 2.0):
+    """incoming/*.jsonl → processing/ (claimed) → done/ (+ .results.jsonl) or failed/ (+ .error.txt)."""
+    dirs = {d: os.path.join(root, d) for d in ("incoming", "processing", "done", "failed")}
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+    # jobs left in processing/ by a crash are retried first
+    for path in glob.glob(os.path.join(dirs["processing"], "*.jsonl")):
+        os.replace(path, os.path.join(dirs["incoming"], os.path.basename(path)))
+
+    while not stop.is_set():
+        for path in _oldest_first(glob.glob(os.path.join(dirs["incoming"], "*.jsonl"))):
+            job = os.path.basename(path)
+            claimed = os.path.join(dirs["processing"], job)
+            try:
+                os.replace(path, claimed)
+            except OSError:
+                continue
+            stem = job[:-len(".jsonl")]
+            log.info(f"[SERVE] spool job {job} started")
+            try:
+                names = _read_names(claimed)
+                n = 0
+                with JSONLResultWriter(os.path.join(dirs["done"], f"{stem}.results.jsonl")) as out:
+                    for row in service.run_job(names):
+                        out.write(row)
+                        n += 1
+                os.replace(claimed, os.path.join(dirs["done"], job))
+                log.info(f"[SERVE] spool job {job} done: {n} rows")
+            except Exception as e:
+                log.error(f"[SERVE] spool job {job} failed: {e}")
+                with open(os.path.join(dirs["failed"], f"{stem}.error.txt"), "w", encoding="utf-8") as f:
+                    f.write(f"{type(e).__name__}: {e}\n")
+                os.replace(claimed, os.path.join(dirs["failed"], job))
+            if stop.is_set():
+                return
+        stop.wait(interval)
+
+# ---------- HTTP endpoint ----------
+def make_handler(service: EnrichmentService):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.0: the streamed body simply ends when the connection closes
+        def log_message(self, fmt, *args):
+            log.debug(f"[SERVE] {self.address_string()} {fmt % args}")
+
+        def _json(self, code: int, body: Dict[str, Any]):
+            data = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._json(200, {"status": "ok", "jobs_running": service.running,
+                                        "metrics": METRICS.summary()})
+            self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/enrich":
+                return self._json(404, {"error": "not found"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0) or 0)) or b"{}")
+                names = [str(n) for n in body.get("names", []) if str(n).strip()]
+            except (ValueError, AttributeError, TypeError):
+                return self._json(400, {"error": 'expected JSON: {"names": [...]}'})
+            if not names:
+                return self._json(400, {"error": 'expected JSON: {"names": [...]}'})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            rows = service.run_job(names)
+            try:
+                for row in rows:
+                    self.wfile.write((json.dumps(row, ensure_ascii=False) + "\n").encode())
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                log.info(f"[SERVE] client went away; job of {len(names)} names stopped")
+            finally:
+                rows.close()
+
+    return Handler
+
+def _terminate(*_):
+    raise KeyboardInterrupt  # SIGTERM (service managers) shuts down like Ctrl+C
+
+def serve(host: str = "127.0.0.1", port: int = 8088, spool: Optional[str] = None, **service_kw):
+    service = EnrichmentService(**service_kw)
+    signal.signal(signal.SIGTERM, _terminate)
+    stop = threading.Event()
+    watcher = None
+    if spool:
+        watcher = threading.Thread(target=watch_spool, args=(service, spool, stop), name="spool", daemon=True)
+        watcher.start()
+        print(f"Watching {os.path.join(spool, 'incoming')} for *.jsonl jobs")
+    server = None
+    if port:
+        server = ThreadingHTTPServer((host, port), make_handler(service))
+        server.daemon_threads = True
+        print(f"Listening on http://{host}:{server.server_address[1]} (POST /enrich, GET /health)")
+    try:
+        if server:
+            server.serve_forever()
+        elif watcher:
+            while watcher.is_alive():
+                watcher.join(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if server:
+            server.server_close()
+        service.close()
+        print("\n" + METRICS.format_table())
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Enrichment service (warm pools and caches between jobs)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8088, help="HTTP port (0 = no HTTP endpoint)")
+    p.add_argument("--spool", help="spool directory to watch for *.jsonl jobs")
+    p.add_argument("--workers", type=int, default=8, help="names enriched in parallel")
+    p.add_argument("--batch-size", type=int, default=50, help="company URLs per Bright Data dataset request")
+    p.add_argument("--max-jobs", type=int, default=2, help="jobs running at once (others wait)")
+    p.add_argument("--serp-concurrency", type=int, help="max in-flight SERP requests")
+    p.add_argument("--dataset-concurrency", type=int, help="max in-flight dataset requests")
+    p.add_argument("--crawl-concurrency", type=int, help="max in-flight website fetches")
+    p.add_argument("--parse-workers", type=int, help="processes parsing HTML (0 = parse in the fetch threads)")
+    p.add_argument("--no-dedup", action="store_true", help="enrich every row, even near-duplicate names")
+    p.add_argument("--incremental", action="store_true", help="reuse fresh results from earlier runs (RESULT_STORE_PATH)")
+    p.add_argument("--max-age-days", type=float, default=30, help="with --incremental: re-enrich results older than this")
+    args = p.parse_args()
+    if not args.port and not args.spool:
+        p.error("nothing to serve: give --port and/or --spool")
+    LIMITS.configure(serp=args.serp_concurrency, dataset=args.dataset_concurrency, crawl=args.crawl_concurrency)
+    serve(args.host, args.port, args.spool, workers=args.workers, batch_size=args.batch_size,
+          parse_workers=args.parse_workers, dedup=not args.no_dedup, incremental=args.incremental,
+          max_age_days=args.max_age_days, max_jobs=args.max_jobs)
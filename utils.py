@@ -1,33 +1,79 @@
-import os, time, requests, urllib.parse, logging
+import os, time, random, urllib.parse, logging, threading
 from dotenv import load_dotenv
 
 load_dotenv()
 API_KEY    = os.getenv("BRIGHTDATA_API_KEY")
 SERP_ZONE  = os.getenv("BRIGHTDATA_API_ZONE")
 DATASET_ID = os.getenv("BD_COMPANY_DATASET_ID")
-
-if not API_KEY or not SERP_ZONE or not DATASET_ID:
-    raise RuntimeError("Missing BRIGHTDATA_API_KEY / BRIGHTDATA_API_ZONE / BD_COMPANY_DATASET_ID in .env")
+# override to point every Bright Data call at a stand-in (e.g. bench/fake_services.py)
+BD_API_BASE = os.getenv("BRIGHTDATA_API_BASE", "https://api.brightdata.com").rstrip("/")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO), format="%(levelname)s %(message)s")
 log = logging.getLogger(__name__)
 
-SESSION = requests.Session()
-SESSION.headers.update({
-    "Authorization": f"Bearer {API_KEY}",
-    "Content-Type": "application/json"
-})
+BROWSER_UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0.0.0 Safari/537.36")
+
+def require_brightdata():
+    """
+    Not checked at import, so scripts that never call Bright Data don't need its settings;
+    enrichment entry points call it up front so a missing .env fails once, not per row.
+    """
+    if not API_KEY or not SERP_ZONE or not DATASET_ID:
+        raise RuntimeError("Missing BRIGHTDATA_API_KEY / BRIGHTDATA_API_ZONE / BD_COMPANY_DATASET_ID in .env")
+
+# SESSION (Bright Data API) and BROWSER (company websites) are built on first access:
+# importing utils doesn't pay for `requests` or check Bright Data settings.
+_session_lock = threading.Lock()
+
+def _make_session(name: str):
+    import requests
+    s = requests.Session()
+    if name == "SESSION":
+        require_brightdata()
+        s.headers.update({
+            "Authorization": f"Bearer {API_KEY}",
+            "Content-Type": "application/json"
+        })
+    else:
+        s.headers.update({"User-Agent": BROWSER_UA})
+    return s
+
+def __getattr__(name: str):
+    if name in ("SESSION", "BROWSER"):
+        with _session_lock:
+            if name not in globals():
+                globals()[name] = _make_session(name)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class ConcurrencyLimits:
+    """Per-endpoint concurrency caps shared by every worker thread in a run."""
+
+    def __init__(self, serp: int = 4, dataset: int = 2, crawl: int = 8):
+        self.configure(serp=serp, dataset=dataset, crawl=crawl)
+
+    def configure(self, serp: int | None = None, dataset: int | None = None, crawl: int | None = None):
+        if serp:
+            self.serp = threading.BoundedSemaphore(serp)
+        if dataset:
+            self.dataset = threading.BoundedSemaphore(dataset)
+        if crawl:
+            self.crawl = threading.BoundedSemaphore(crawl)
+            self.crawl_slots = crawl  # sizes thread pools that only feed this cap
 
-BROWSER = requests.Session()
-BROWSER.headers.update({
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/124.0.0.0 Safari/537.36"
-})
+LIMITS = ConcurrencyLimits(
+    serp=int(os.getenv("SERP_CONCURRENCY", "4")),
+    dataset=int(os.getenv("DATASET_CONCURRENCY", "2")),
+    crawl=int(os.getenv("CRAWL_CONCURRENCY", "8")),
+)
 
 def google_query_url(q: str) -> str:
     return f"https://www.google.com/search?q={urllib.parse.quote(q)}&brd_json=1"
 
 def backoff_sleep(attempt: int):
-    time.sleep(min(2 ** attempt, 30))
+    # jittered so concurrent workers that failed together don't retry in lockstep
+    delay = min(2 ** attempt, 30)
+    time.sleep(delay / 2 + random.uniform(0, delay / 2))